@@ -0,0 +1,290 @@
+"""
+Batch price-alert checker.
+
+Due alerts are claimed from the database with a time-limited lease, so any
+number of API workers or processes can sweep concurrently without checking
+the same alert twice, and schedules (next_check_at) survive restarts.
+Sweeps claim whole products: the most overdue products are picked and every
+active alert on them is leased together, so a product's subscribers never
+end up split across batches or workers. Each product's price is looked up
+once and all of its subscribers are evaluated against it. When
+it is next due depends on its price history and how close subscribers'
+targets are (see alert_schedule).
+"""
+import os
+import time
+import uuid
+import socket
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+
+import metrics
+from models import PriceAlert, session_scope
+from email_utils import send_alert_digests
+from retailers import product_id_for_url, retailer_for_url
+from price_history import price_activity, record_observations
+from alert_schedule import (
+    ALERT_VOLATILITY_DAYS, budget_scale, desired_interval, planned_lookups_per_hour
+)
+
+logger = logging.getLogger(__name__)
+
+ALERT_RETRY_MINUTES = float(os.getenv("ALERT_RETRY_MINUTES", "30"))
+ALERT_SWEEP_INTERVAL_MINUTES = float(os.getenv("ALERT_SWEEP_INTERVAL_MINUTES", "1"))
+# Products, with all of their alerts, claimed per database round trip
+ALERT_SWEEP_BATCH_SIZE = int(os.getenv("ALERT_SWEEP_BATCH_SIZE", "100"))
+ALERT_LEASE_SECONDS = float(os.getenv("ALERT_LEASE_SECONDS", "600"))
+
+# Report from the most recent sweep in this process, exposed by the API
+last_sweep_report: dict = {}
+
+SWEEP_SECONDS = metrics.histogram(
+    "price_tracker_alert_sweep_seconds",
+    "Wall time of alert sweeps (scheduled) and immediate checks of new alerts (targeted)",
+    ("kind",)
+)
+SWEEP_ITEMS = metrics.counter(
+    "price_tracker_alert_sweep_items_total",
+    "Alerts checked, price lookups, failed alerts and users notified by alert sweeps",
+    ("item",)
+)
+CHECK_INTERVAL_SECONDS = metrics.histogram(
+    "price_tracker_alert_check_interval_seconds",
+    "Time until a product's next check, as scheduled after a successful lookup",
+    buckets=(900, 1800, 3600, 7200, 14400, 21600, 43200, 86400, 172800, 259200)
+)
+
+
+def claim_due_alerts(db, now: datetime, limit: int = ALERT_SWEEP_BATCH_SIZE,
+                     alert_ids: Optional[Iterable[int]] = None) -> List[PriceAlert]:
+    """
+    Atomically lease the alerts of up to `limit` due products to this caller.
+
+    A product is due when one of its active, unleased (or lease-expired)
+    alerts has next_check_at unset or in the past; every active, unleased
+    alert of a due product is claimed with it. When `alert_ids` is given
+    those alerts are claimed regardless of next_check_at.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+    unleased = and_(
+        PriceAlert.is_active == True,
+        or_(PriceAlert.lease_expires_at == None, PriceAlert.lease_expires_at < now)
+    )
+    claimable = unleased
+    if alert_ids is not None:
+        claimable = and_(claimable, PriceAlert.id.in_(list(alert_ids)))
+    else:
+        # Alerts not linked to the catalog yet are grouped by URL, as in planned_lookups_per_hour
+        product = func.coalesce(PriceAlert.product_id, PriceAlert.product_url)
+        due_products = (
+            select(product)
+            .where(unleased, or_(PriceAlert.next_check_at == None, PriceAlert.next_check_at <= now))
+            .group_by(product)
+            .order_by(func.min(func.coalesce(PriceAlert.next_check_at, now)))
+            .limit(limit)
+        )
+        claimable = and_(claimable, product.in_(due_products.scalar_subquery()))
+
+    # SKIP LOCKED lets concurrent Postgres workers pass over each other's rows;
+    # SQLite serializes the UPDATE instead and ignores the clause. A worker that
+    # picked the same products finds their alerts leased and claims none of them
+    candidates = (
+        select(PriceAlert.id)
+        .where(claimable)
+        .with_for_update(skip_locked=True)
+    )
+    db.execute(
+        update(PriceAlert)
+        .where(PriceAlert.id.in_(candidates.scalar_subquery()), unleased)
+        .values(lease_owner=owner, lease_expires_at=now + timedelta(seconds=ALERT_LEASE_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return db.query(PriceAlert).filter(PriceAlert.lease_owner == owner).all()
+
+
+def _renew_lease(db, owner: str):
+    """Extend the lease on every alert `owner` still holds; called after each product of a batch."""
+    db.execute(
+        update(PriceAlert)
+        .where(PriceAlert.lease_owner == owner)
+        .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=ALERT_LEASE_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _still_leased(db, alerts: List[PriceAlert], owner: str) -> List[PriceAlert]:
+    """The alerts whose lease `owner` has not lost to another worker."""
+    held = set(db.scalars(
+        select(PriceAlert.id).where(PriceAlert.id.in_([alert.id for alert in alerts]), PriceAlert.lease_owner == owner)
+    ))
+    return [alert for alert in alerts if alert.id in held]
+
+
+def _release(db, alerts: List[PriceAlert], owner: str, next_check_at: datetime):
+    db.execute(
+        update(PriceAlert)
+        .where(PriceAlert.id.in_([alert.id for alert in alerts]), PriceAlert.lease_owner == owner)
+        .values(next_check_at=next_check_at, lease_owner=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def check_claimed_alerts(db, alerts: List[PriceAlert],
+                         lookup_price: Callable[[str], Optional[float]],
+                         notifications: List[dict], scale: float = 1.0) -> dict:
+    # All of a batch was leased in one claim, under one owner
+    owner = alerts[0].lease_owner
+    # Alerts on the same catalog product share one lookup, whichever URL they were created with
+    groups = defaultdict(list)
+    for alert in alerts:
+        groups[alert.product_id or product_id_for_url(alert.product_url)].append(alert)
+    activity = price_activity(db, groups, datetime.utcnow() - timedelta(days=ALERT_VOLATILITY_DAYS))
+
+    scrapes = 0
+    failed = 0
+    for key, group in groups.items():
+        representative = group[0]
+        try:
+            scrapes += 1
+            price = lookup_price(representative.product_url)
+        except Exception as e:
+            logger.error(f"Error looking up price for {key}: {str(e)}")
+            price = None
+
+        checked_at = datetime.utcnow()
+        # A lookup that outlived the lease leaves these alerts to whichever worker re-claimed them
+        group = _still_leased(db, group, owner)
+        if not group:
+            logger.warning(f"Lost the lease on alerts for {key} during its lookup; skipping them")
+            _renew_lease(db, owner)
+            db.commit()
+            continue
+        if price is None:
+            failed += len(group)
+            _release(db, group, owner, checked_at + timedelta(minutes=ALERT_RETRY_MINUTES))
+            _renew_lease(db, owner)
+            db.commit()
+            continue
+
+        changes, last_change = activity.get(key, (0, None))
+        previous = representative.current_price
+        if previous is not None and previous != float('inf') and previous != price:
+            changes += 1
+            last_change = checked_at
+
+        spec = retailer_for_url(representative.product_url)
+        record_observations(
+            db,
+            [(key, spec["name"] if spec else None, price)],
+            observed_at=checked_at
+        )
+        for alert in group:
+            previous_price, previous_check = alert.current_price, alert.last_checked
+            alert.current_price = price
+            alert.last_checked = checked_at
+            alert.desired_check_seconds = desired_interval(
+                price, alert.target_price, changes, last_change, checked_at
+            ).total_seconds()
+
+            # Email once per drop to the target: when the price crosses it, or again while the
+            # email for the previous check did not go out. Emails go out once per sweep
+            crossed = previous_price is None or previous_price > alert.target_price
+            emailed = alert.last_notified is not None and (previous_check is None or alert.last_notified >= previous_check)
+            if price <= alert.target_price and (crossed or not emailed):
+                notifications.append({
+                    "alert_id": alert.id,
+                    "user_email": alert.user_email,
+                    "product_title": alert.product_title,
+                    "current_price": price,
+                    "target_price": alert.target_price,
+                    "product_url": alert.product_url,
+                })
+        # The product's most urgent subscriber sets when all of them are checked next
+        interval = timedelta(seconds=min(alert.desired_check_seconds for alert in group) * scale)
+        CHECK_INTERVAL_SECONDS.observe(interval.total_seconds())
+        _release(db, group, owner, checked_at + interval)
+        _renew_lease(db, owner)
+        db.commit()
+
+    return {"products": len(groups), "scrapes": scrapes, "failed": failed}
+
+
+def notify_users(db, notifications: List[dict]) -> int:
+    """Send one digest per user and mark the alerts whose email went out."""
+    if not notifications:
+        return 0
+    try:
+        sent = send_alert_digests(notifications)
+    except Exception as e:
+        logger.error(f"Failed to send price alert emails: {str(e)}")
+        return 0
+
+    notified_ids = [n["alert_id"] for n in notifications if sent.get(n["user_email"])]
+    if notified_ids:
+        db.execute(
+            update(PriceAlert)
+            .where(PriceAlert.id.in_(notified_ids))
+            .values(last_notified=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    return len(notified_ids)
+
+
+def run_alert_sweep(lookup_price: Callable[[str], Optional[float]],
+                    alert_ids: Optional[Iterable[int]] = None,
+                    batch_size: int = ALERT_SWEEP_BATCH_SIZE) -> dict:
+    """
+    Claim and check due alerts (or just `alert_ids`) until none are left.
+
+    Args:
+        lookup_price: Called as lookup_price(product_url) and returns the
+            product's current price, or None if it could not be found
+        alert_ids: Check only these alerts regardless of their next_check_at
+        batch_size (int): Products claimed per database round trip, each with all of its alerts
+
+    Returns:
+        dict: Sweep report with alert, product and scrape counts and wall time
+    """
+    global last_sweep_report
+    started = time.monotonic()
+    totals = {"alerts": 0, "products": 0, "scrapes": 0, "failed": 0}
+    notifications = []
+    with session_scope() as db:
+        scale = budget_scale(planned_lookups_per_hour(db))
+        while True:
+            alerts = claim_due_alerts(db, datetime.utcnow(), batch_size, alert_ids)
+            if not alerts:
+                break
+            totals["alerts"] += len(alerts)
+            for name, value in check_claimed_alerts(db, alerts, lookup_price, notifications, scale).items():
+                totals[name] += value
+            if alert_ids is not None:
+                break
+        totals["notified"] = notify_users(db, notifications)
+        totals["emails"] = len({n["user_email"] for n in notifications})
+
+    scrapes = totals["scrapes"]
+    report = {
+        "finished_at": datetime.utcnow().isoformat(),
+        **totals,
+        "alerts_per_scrape": round(totals["alerts"] / scrapes, 2) if scrapes else 0.0,
+        "budget_scale": round(scale, 2),
+        "wall_time": round(time.monotonic() - started, 3),
+    }
+    if totals["alerts"]:
+        logger.info(
+            f"Alert sweep checked {report['alerts']} alerts with {scrapes} scrapes "
+            f"({report['alerts_per_scrape']} alerts/scrape) in {report['wall_time']}s"
+        )
+    SWEEP_SECONDS.observe(report["wall_time"], kind="scheduled" if alert_ids is None else "targeted")
+    for item in ("alerts", "scrapes", "failed", "notified"):
+        SWEEP_ITEMS.inc(report[item], item=item)
+    if alert_ids is None:
+        last_sweep_report = report
+    return report
@@ -0,0 +1,95 @@
+"""
+Adaptive alert check intervals.
+
+Each product's next check is the base interval scaled down when a
+subscriber's target is close to the current price or the price has been
+changing, and scaled up when the price has sat still for weeks or is
+already at the target (the subscriber was notified when it got there). The
+interval an alert asks for is stored with it. When all products together
+ask for more lookups per hour than ALERT_SCRAPE_BUDGET_PER_HOUR, every
+interval is stretched by the same factor, so urgent products still come
+first. Sweeps claim alerts in next_check_at order, which makes the
+(is_active, next_check_at) index the priority queue.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from models import PriceAlert
+
+ALERT_CHECK_INTERVAL_HOURS = float(os.getenv("ALERT_CHECK_INTERVAL_HOURS", "6"))
+ALERT_MIN_CHECK_MINUTES = float(os.getenv("ALERT_MIN_CHECK_MINUTES", "15"))
+ALERT_MAX_CHECK_HOURS = float(os.getenv("ALERT_MAX_CHECK_HOURS", "72"))
+# Price gap above the target, as a share of the target, at which the base interval applies
+ALERT_NEAR_TARGET_GAP = float(os.getenv("ALERT_NEAR_TARGET_GAP", "0.2"))
+ALERT_VOLATILITY_DAYS = float(os.getenv("ALERT_VOLATILITY_DAYS", "14"))
+# Product-page lookups per hour all alert sweeps may plan for; 0 disables the cap
+ALERT_SCRAPE_BUDGET_PER_HOUR = float(os.getenv("ALERT_SCRAPE_BUDGET_PER_HOUR", "1000"))
+
+
+def proximity_factor(current_price: float, target_price: float) -> float:
+    """1/8 of the base interval for prices within a few percent above the target, up to 2x for distant ones or ones at the target."""
+    if not target_price or target_price <= 0 or current_price is None or current_price == float("inf"):
+        return 1.0
+    if current_price <= target_price:
+        # Already at the target: the subscriber was notified on the way down, and only a
+        # rise back above it (which ends the wait for the next drop) is left to catch
+        return 2.0
+    gap = (current_price - target_price) / target_price
+    return min(max(gap / ALERT_NEAR_TARGET_GAP, 0.125), 2.0)
+
+
+def volatility_factor(changes: int, last_change: Optional[datetime], now: datetime) -> float:
+    """Shorter intervals for products whose price changed recently and often; longer for ones idle for weeks."""
+    if last_change is None:
+        return 1.0
+    factor = 1.0 / (1.0 + changes / 2.0)
+    idle_days = (now - last_change).total_seconds() / 86400
+    if changes == 0 and idle_days > ALERT_VOLATILITY_DAYS:
+        factor *= min(idle_days / ALERT_VOLATILITY_DAYS, 4.0)
+    return factor
+
+
+def desired_interval(current_price: float, target_price: float, changes: int,
+                     last_change: Optional[datetime], now: datetime) -> timedelta:
+    """
+    Interval an alert asks for before the hourly budget is applied.
+
+    Args:
+        current_price (float): Price just observed
+        target_price (float): The subscriber's target
+        changes (int): Price changes in the last ALERT_VOLATILITY_DAYS
+        last_change (datetime): Time of the latest price change, None without history
+        now (datetime): Check time (UTC)
+
+    Returns:
+        timedelta: Between ALERT_MIN_CHECK_MINUTES and ALERT_MAX_CHECK_HOURS
+    """
+    hours = (
+        ALERT_CHECK_INTERVAL_HOURS
+        * proximity_factor(current_price, target_price)
+        * volatility_factor(changes, last_change, now)
+    )
+    hours = min(max(hours, ALERT_MIN_CHECK_MINUTES / 60), ALERT_MAX_CHECK_HOURS)
+    return timedelta(hours=hours)
+
+
+def planned_lookups_per_hour(db) -> float:
+    """Product-page lookups per hour the active alerts ask for; each product is looked up once per its shortest interval."""
+    base_seconds = ALERT_CHECK_INTERVAL_HOURS * 3600
+    per_product = (
+        select(func.min(func.coalesce(PriceAlert.desired_check_seconds, base_seconds)).label("seconds"))
+        .where(PriceAlert.is_active == True)
+        .group_by(func.coalesce(PriceAlert.product_id, PriceAlert.product_url))
+        .subquery()
+    )
+    return float(db.scalar(select(func.sum(3600.0 / per_product.c.seconds))) or 0.0)
+
+
+def budget_scale(lookups_per_hour: float, budget: float = ALERT_SCRAPE_BUDGET_PER_HOUR) -> float:
+    """Factor applied to every desired interval so planned lookups fit the budget; never below 1."""
+    if budget <= 0 or lookups_per_hour <= budget:
+        return 1.0
+    return lookups_per_hour / budget
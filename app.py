@@ -1,34 +1,76 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import WebDriverException, TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-import undetected_chromedriver as uc
-import re
 import time
 import os
-import sys
-import shutil
+import threading
 import logging
-import random
-from typing import List, Optional
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
-from models import get_db, PriceAlert
-from email_utils import send_price_alert
+from models import get_db, init_db, session_scope, PriceAlert, SearchJob
+from retailers import RETAILERS, normalize_product_url
+from rate_limit import rate_limiter
+from http_scraper import tier_stats
+import metrics
+from search_cache import SearchCache, make_key
+from json_response import FastJSONResponse, dumps
+from compression import CompressionMiddleware
+from static_files import index_page, stylesheet_response
+from search_service import (
+    ProductResult, driver_pool, run_search, search_retailer, summarize_search, is_complete_search
+)
+from search_jobs import enqueue_search, completed_search, job_view, DONE
+from scrape_worker import SearchWorkerPool
+from product_page import lookup_product_price
+from price_history import get_history, to_naive_utc
+from catalog import ensure_products, link_alert_products
+import alert_checker
+from alert_checker import run_alert_sweep, ALERT_SWEEP_INTERVAL_MINUTES
+from email_utils import EmailConfigError, check_email_settings, close_dispatcher
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Create scheduler; started by the lifespan hook, so importing this module starts nothing
+scheduler = BackgroundScheduler()
+
+# Searches submitted as jobs are scraped in these processes, not in the API workers
+search_workers = SearchWorkerPool()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        check_email_settings()
+    except EmailConfigError as e:
+        # Only alert emails need credentials; say so now rather than at the first triggered alert
+        logger.warning(f"{str(e)}; price alert emails will not be sent")
+    # Schema first: everything after it reads or writes the database
+    init_db()
+    with session_scope() as db:
+        # Alerts created before the product catalog get normalized URLs and product ids once
+        link_alert_products(db)
+    scheduler.start()
+    search_workers.start()
+    if not search_workers.workers:
+        # Without workers every search is scraped here, so browsers warm in the background
+        # while /healthz answers. With workers, the API's browsers launch when first leased
+        threading.Thread(target=driver_pool.warm, name="driver-pool-warmup", daemon=True).start()
+    logger.info("Startup complete")
+    yield
+    search_workers.close()
+    scheduler.shutdown(wait=False)
+    close_dispatcher()
+    driver_pool.close()
+
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -37,16 +79,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
-class ProductResult(BaseModel):
-    title: str
-    price: float
-    url: str
-    source: str
-    image_url: Optional[str] = None
-    rating: Optional[float] = None
-    reviews_count: Optional[int] = None
+# Compress JSON and NDJSON responses; the frontend files are precompressed
+app.add_middleware(CompressionMiddleware)
 
 class AlertCreate(BaseModel):
     user_email: str
@@ -54,6 +91,13 @@ class AlertCreate(BaseModel):
     product_title: str
     target_price: float
 
+class AlertBulkCreate(BaseModel):
+    alerts: List[AlertCreate]
+
+class SearchJobCreate(BaseModel):
+    query: str
+    retailers: Optional[str] = None
+
 class AlertResponse(BaseModel):
     id: int
     user_email: str
@@ -65,651 +109,208 @@ class AlertResponse(BaseModel):
     created_at: datetime
     last_checked: datetime
 
-def get_random_user_agent():
-    user_agents = [
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0"
-    ]
-    return random.choice(user_agents)
-
-def setup_driver():
+@app.get("/healthz")
+def get_health():
+    # Answers as soon as startup finishes; browsers still starting just show a lower total
     try:
-        logger.info("Setting up undetected-chromedriver...")
-        options = uc.ChromeOptions()
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument(f"--user-agent={get_random_user_agent()}")
-        
-        # Additional options to avoid detection
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--disable-notifications")
-        
-        driver = uc.Chrome(options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        logger.info("Successfully created driver with undetected-chromedriver")
-        return driver
+        with session_scope() as db:
+            db.execute(text("SELECT 1"))
+        database = "ok"
     except Exception as e:
-        logger.error(f"Error setting up ChromeDriver: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to initialize browser: {str(e)}")
+        logger.error(f"Health check database error: {str(e)}")
+        database = "error"
+    body = {
+        "status": "ok" if database == "ok" else "error",
+        "database": database,
+        "scheduler": scheduler.running,
+        "search_workers": search_workers.stats(),
+        "browsers": {key: value for key, value in driver_pool.stats().items() if key in ("size", "total", "idle")},
+    }
+    return FastJSONResponse(body, status_code=200 if database == "ok" else 503)
 
-def extract_price(price_text: str) -> float:
-    if not price_text:
-        return 0.0
-    try:
-        # Remove any currency symbols and commas
-        cleaned_text = price_text.replace('$', '').replace(',', '').strip()
-        # Find the first number in the text
-        price_match = re.search(r'\d+\.?\d*', cleaned_text)
-        return float(price_match.group()) if price_match else 0.0
-    except Exception as e:
-        logger.error(f"Error extracting price from {price_text}: {str(e)}")
-        return 0.0
+@app.get("/", include_in_schema=False)
+def get_index_page(request: Request):
+    return index_page.response(request)
 
-def safe_get_text(element, selector: str, default: str = "") -> str:
-    try:
-        return element.find_element(By.CSS_SELECTOR, selector).text
-    except Exception:
-        return default
+@app.get("/style.css", include_in_schema=False)
+def get_stylesheet(request: Request):
+    return stylesheet_response(request)
 
-def safe_get_attribute(element, selector: str, attribute: str, default: str = "") -> str:
-    try:
-        return element.find_element(By.CSS_SELECTOR, selector).get_attribute(attribute)
-    except Exception:
-        return default
+@app.get("/metrics")
+async def get_prometheus_metrics():
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
 
-def scrape_amazon(driver: webdriver.Chrome, query: str) -> List[ProductResult]:
-    results = []
-    try:
-        url = f"https://www.amazon.com/s?k={query.replace(' ', '+')}"
-        logger.info(f"Scraping Amazon: {url}")
-        
-        # Add random delay before request
-        time.sleep(random.uniform(2, 4))
-        driver.get(url)
-        
-        # Wait for main content to load
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.s-main-slot"))
-        )
-        
-        # Multiple selectors for product containers
-        selectors = [
-            "div.s-result-item[data-component-type='s-search-result']",
-            "div.sg-col-4-of-12",
-            "div.sg-col-4-of-16"
-        ]
-        
-        products = []
-        for selector in selectors:
-            products = driver.find_elements(By.CSS_SELECTOR, selector)
-            if products:
-                logger.info(f"Found {len(products)} products with selector: {selector}")
-                break
-        
-        if not products:
-            logger.warning("No products found with any selector")
-            return results
-        
-        # Increase number of products to process
-        for product in products[:10]:  # Changed from 5 to 10
-            try:
-                # Multiple selectors for title
-                title = None
-                title_selectors = [
-                    "h2 a span",
-                    "h2 span.a-text-normal",
-                    "span.a-text-normal",
-                    "a.a-link-normal span"
-                ]
-                for selector in title_selectors:
-                    title = safe_get_text(product, selector)
-                    if title:
-                        break
-                
-                if not title:
-                    continue
-                
-                # Multiple selectors for price
-                price = 0.0
-                price_selectors = [
-                    "span.a-price span.a-offscreen",
-                    "span.a-price-whole",
-                    "span.a-price"
-                ]
-                for selector in price_selectors:
-                    price_text = safe_get_text(product, selector)
-                    if price_text:
-                        price = extract_price(price_text)
-                        if price > 0:
-                            break
-                
-                if price == 0:
-                    continue
-                
-                # Multiple selectors for URL
-                url = None
-                url_selectors = [
-                    "h2 a",
-                    "a.a-link-normal",
-                    "a[href*='/dp/']"
-                ]
-                for selector in url_selectors:
-                    url = safe_get_attribute(product, selector, "href")
-                    if url:
-                        if not url.startswith("http"):
-                            url = f"https://www.amazon.com{url}"
-                        break
-                
-                if not url:
-                    continue
-                
-                # Get image URL
-                image = safe_get_attribute(product, "img.s-image", "src")
-                if not image:
-                    image = safe_get_attribute(product, "img[data-image-load]", "src")
-                
-                # Get rating
-                rating = None
-                rating_text = safe_get_text(product, "span.a-icon-alt")
-                if rating_text:
-                    try:
-                        rating = float(rating_text.split()[0])
-                    except:
-                        pass
-                
-                # Get reviews count
-                reviews_count = None
-                reviews_text = safe_get_text(product, "span.a-size-base.s-underline-text")
-                if reviews_text:
-                    try:
-                        reviews_count = int(reviews_text.replace(",", ""))
-                    except:
-                        pass
-                
-                results.append(ProductResult(
-                    title=title,
-                    price=price,
-                    url=url,
-                    source="Amazon",
-                    image_url=image,
-                    rating=rating,
-                    reviews_count=reviews_count
-                ))
-                logger.info(f"Successfully scraped product: {title[:50]}...")
-                
-            except Exception as e:
-                logger.error(f"Error scraping Amazon product: {str(e)}")
-                continue
-                
-    except Exception as e:
-        logger.error(f"Error scraping Amazon: {str(e)}")
-    
-    logger.info(f"Successfully scraped {len(results)} products from Amazon")
-    return results
+@app.get("/metrics/driver-pool")
+async def get_driver_pool_metrics():
+    return driver_pool.stats()
 
-def scrape_walmart(driver: webdriver.Chrome, query: str) -> List[ProductResult]:
-    results = []
-    try:
-        url = f"https://www.walmart.com/search?q={query.replace(' ', '+')}"
-        logger.info(f"Scraping Walmart: {url}")
-        
-        # Add longer random delay before request
-        time.sleep(random.uniform(3, 5))
-        
-        # Clear cookies and local storage before visiting
-        driver.execute_script("window.localStorage.clear();")
-        driver.execute_script("window.sessionStorage.clear();")
-        driver.delete_all_cookies()
-        
-        # Set up custom headers
-        driver.execute_cdp_cmd('Network.setExtraHTTPHeaders', {
-            'headers': {
-                'User-Agent': get_random_user_agent(),
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Cache-Control': 'max-age=0'
-            }
-        })
-        
-        # Navigate to the URL
-        driver.get(url)
-        logger.info("Navigated to Walmart search page")
-        
-        # Wait for page load with multiple selectors
-        wait = WebDriverWait(driver, 20)
-        content_selectors = [
-            "div[data-item-id]",
-            "div[data-testid='search-results']",
-            "section[data-testid='search-results']",
-            "div[class*='SearchResultsGridView']"
-        ]
-        
-        found_content = False
-        for selector in content_selectors:
-            try:
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                found_content = True
-                logger.info(f"Found Walmart content with selector: {selector}")
-                break
-            except:
-                continue
-        
-        if not found_content:
-            logger.warning("Could not find Walmart search results")
-            return results
-        
-        # Scroll to load more products
-        for _ in range(5):
-            driver.execute_script("window.scrollBy(0, 1000)")
-            time.sleep(1)
-        
-        # Try different product selectors
-        product_selectors = [
-            "div[data-item-id]",
-            "div[data-testid='search-result']",
-            "div[class*='SearchResultsGridView'] > div",
-            "div[data-automation-id='product']"
-        ]
-        
-        products = []
-        for selector in product_selectors:
-            try:
-                products = driver.find_elements(By.CSS_SELECTOR, selector)
-                if products:
-                    logger.info(f"Found {len(products)} Walmart products with selector: {selector}")
-                    break
-            except Exception as e:
-                logger.error(f"Error with selector {selector}: {str(e)}")
-                continue
-        
-        if not products:
-            logger.warning("No Walmart products found after trying all selectors")
-            return results
-        
-        # Process found products
-        for product in products[:15]:  # Increased to 15 products
-            try:
-                # Scroll product into view
-                driver.execute_script("arguments[0].scrollIntoView(true);", product)
-                time.sleep(0.5)
-                
-                # Get title with multiple selectors
-                title = None
-                title_selectors = [
-                    "span[data-automation-id='product-title']",
-                    "span.w_kV",
-                    "div[class*='heading'] span",
-                    "a[class*='product-title-link']",
-                    "*[class*='title']"
-                ]
-                
-                for selector in title_selectors:
-                    try:
-                        title_elem = product.find_element(By.CSS_SELECTOR, selector)
-                        title = title_elem.text.strip()
-                        if title:
-                            break
-                    except:
-                        continue
-                
-                if not title:
-                    logger.warning("Could not find title for Walmart product")
-                    continue
-                
-                # Get price with multiple selectors
-                price = 0.0
-                price_selectors = [
-                    "div[data-automation-id='product-price']",
-                    "span[class*='price-characteristic']",
-                    "span[class*='price']",
-                    "div[class*='price-box']",
-                    "*[class*='price']"
-                ]
-                
-                for selector in price_selectors:
-                    try:
-                        price_elem = product.find_element(By.CSS_SELECTOR, selector)
-                        price_text = price_elem.text
-                        price = extract_price(price_text)
-                        if price > 0:
-                            break
-                    except:
-                        continue
-                
-                if price == 0:
-                    logger.warning("Could not find valid price for Walmart product")
-                    continue
-                
-                # Get URL with multiple selectors
-                url = None
-                url_selectors = [
-                    "a[link-identifier='linkText']",
-                    "a[class*='product-title-link']",
-                    "a[href*='/ip/']",
-                    "a"
-                ]
-                
-                for selector in url_selectors:
-                    try:
-                        url_elem = product.find_element(By.CSS_SELECTOR, selector)
-                        url = url_elem.get_attribute("href")
-                        if url and url.startswith("http"):
-                            break
-                    except:
-                        continue
-                
-                if not url:
-                    logger.warning("Could not find URL for Walmart product")
-                    continue
-                
-                # Get image URL
-                image_url = None
-                try:
-                    img_elem = product.find_element(By.CSS_SELECTOR, "img")
-                    image_url = img_elem.get_attribute("src")
-                except:
-                    pass
-                
-                # Get rating and reviews count
-                rating = None
-                reviews_count = None
-                try:
-                    rating_elem = product.find_element(By.CSS_SELECTOR, "span[class*='rating']")
-                    rating_text = rating_elem.get_attribute("aria-label")
-                    if rating_text:
-                        rating_match = re.search(r'(\d+(\.\d+)?)', rating_text)
-                        if rating_match:
-                            rating = float(rating_match.group(1))
-                        
-                        reviews_match = re.search(r'(\d+)\s+reviews?', rating_text)
-                        if reviews_match:
-                            reviews_count = int(reviews_match.group(1))
-                except:
-                    pass
-                
-                results.append(ProductResult(
-                    title=title,
-                    price=price,
-                    url=url,
-                    source="Walmart",
-                    image_url=image_url,
-                    rating=rating,
-                    reviews_count=reviews_count
-                ))
-                logger.info(f"Successfully scraped Walmart product: {title[:50]}...")
-                
-            except Exception as e:
-                logger.error(f"Error processing Walmart product: {str(e)}")
-                continue
-        
-    except Exception as e:
-        logger.error(f"Error scraping Walmart: {str(e)}")
-        logger.exception(e)
-    
-    logger.info(f"Successfully scraped {len(results)} products from Walmart")
-    return results
+@app.get("/metrics/rate-limits")
+async def get_rate_limit_metrics():
+    return rate_limiter.stats()
 
-def scrape_target(driver: webdriver.Chrome, query: str) -> List[ProductResult]:
-    results = []
-    try:
-        url = f"https://www.target.com/s?searchTerm={query.replace(' ', '+')}"
-        logger.info(f"Scraping Target: {url}")
-        
-        # Add longer random delay before request
-        time.sleep(random.uniform(3, 5))
-        
-        # Clear cookies and local storage before visiting
-        driver.execute_script("window.localStorage.clear();")
-        driver.execute_script("window.sessionStorage.clear();")
-        driver.delete_all_cookies()
-        
-        # Add additional headers
-        driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-            "userAgent": get_random_user_agent()
-        })
-        
-        driver.get(url)
-        
-        # Wait for any of these elements to appear
-        selectors = [
-            "[data-test='product-grid']",
-            "[data-test='product-card']",
-            "[data-test='product-results']"
-        ]
-        
-        found_element = False
-        for selector in selectors:
-            try:
-                WebDriverWait(driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                )
-                found_element = True
-                logger.info(f"Found Target page content with selector: {selector}")
-                break
-            except:
-                continue
-        
-        if not found_element:
-            logger.warning("Could not verify Target page load")
-            return results
-        
-        # Scroll down to load more products
-        for _ in range(3):  # Scroll 3 times
-            driver.execute_script("window.scrollBy(0, 800)")
-            time.sleep(1)
-        
-        # Try to find products with different approaches
-        products = []
-        product_selectors = [
-            "[data-test='product-card']",
-            "[data-test='product-grid'] > div",
-            "div[data-test='product-card-default']"
-        ]
-        
-        for selector in product_selectors:
-            try:
-                products = driver.find_elements(By.CSS_SELECTOR, selector)
-                if len(products) > 0:
-                    logger.info(f"Found {len(products)} Target products with selector: {selector}")
-                    break
-            except Exception as e:
-                logger.error(f"Error finding Target products with selector {selector}: {str(e)}")
-                continue
-        
-        if not products:
-            logger.warning("No Target products found")
-            return results
-        
-        # Process more products
-        for product in products[:10]:  # Changed from 5 to 10
-            try:
-                # Wait for product to be interactive
-                driver.execute_script("arguments[0].scrollIntoView(true);", product)
-                time.sleep(0.5)
-                
-                # Get title
-                title = None
-                title_selectors = [
-                    "[data-test='product-title']",
-                    "a[href*='/p/']",
-                    "div[class*='Heading']"
-                ]
-                for selector in title_selectors:
-                    try:
-                        title_elem = product.find_element(By.CSS_SELECTOR, selector)
-                        title = title_elem.text.strip()
-                        if title:
-                            break
-                    except:
-                        continue
-                
-                if not title:
-                    continue
-                
-                # Get price
-                price = 0.0
-                price_selectors = [
-                    "[data-test='product-price']",
-                    "span[data-test='current-price']",
-                    "div[data-test='product-price']"
-                ]
-                for selector in price_selectors:
-                    try:
-                        price_elem = product.find_element(By.CSS_SELECTOR, selector)
-                        price = extract_price(price_elem.text)
-                        if price > 0:
-                            break
-                    except:
-                        continue
-                
-                if price == 0:
-                    continue
-                
-                # Get URL
-                url = None
-                url_selectors = [
-                    "a[href*='/p/']",
-                    "[data-test='product-title'] a",
-                    "a[data-test='product-link']"
-                ]
-                for selector in url_selectors:
-                    try:
-                        url_elem = product.find_element(By.CSS_SELECTOR, selector)
-                        url = url_elem.get_attribute("href")
-                        if url:
-                            break
-                    except:
-                        continue
-                
-                if not url or not url.startswith("http"):
-                    continue
-                
-                results.append(ProductResult(
-                    title=title,
-                    price=price,
-                    url=url,
-                    source="Target",
-                    image_url=None
-                ))
-                logger.info(f"Successfully scraped Target product: {title[:50]}...")
-                
-            except Exception as e:
-                logger.error(f"Error scraping Target product: {str(e)}")
-                continue
-        
-    except Exception as e:
-        logger.error(f"Error scraping Target: {str(e)}")
-    
-    return results
+@app.get("/metrics/scrape-tiers")
+async def get_scrape_tier_metrics():
+    return tier_stats.snapshot()
 
-# Create scheduler
-scheduler = BackgroundScheduler()
-scheduler.start()
+def parse_retailers(retailers: Optional[str]) -> List[str]:
+    if not retailers:
+        return list(RETAILERS)
+    by_name = {name.lower(): name for name in RETAILERS}
+    selected = []
+    for name in retailers.split(","):
+        name = name.strip().lower()
+        if name not in by_name:
+            raise HTTPException(status_code=400, detail=f"Unknown retailer: {name}")
+        if by_name[name] not in selected:
+            selected.append(by_name[name])
+    return selected
+
+search_cache = SearchCache()
+SEARCH_CACHE_LOOKUPS = metrics.counter(
+    "price_tracker_search_cache_lookups_total", "Search requests by cache status", ("status",)
+)
 
 @app.get("/search/{query}")
-async def search_products(query: str):
-    driver = None
+async def search_products(query: str, retailers: Optional[str] = None):
+    selected = parse_retailers(retailers)
     try:
         logger.info(f"Received search request for: {query}")
-        driver = setup_driver()
-        
-        # Scrape from all sources
-        amazon_results = scrape_amazon(driver, query)
-        logger.info(f"Found {len(amazon_results)} Amazon products")
-        
-        # Add delay between scraping different sites
-        time.sleep(random.uniform(2, 3))
-        walmart_results = scrape_walmart(driver, query)
-        logger.info(f"Found {len(walmart_results)} Walmart products")
-        
-        time.sleep(random.uniform(2, 3))
-        target_results = scrape_target(driver, query)
-        logger.info(f"Found {len(target_results)} Target products")
-        
-        # Combine all results
-        all_results = amazon_results + walmart_results + target_results
-        
-        # Sort all results by price
-        sorted_results = sorted(all_results, key=lambda x: x.price)
-        
-        logger.info(f"Total products found: {len(sorted_results)}")
-        
-        return {"results": sorted_results}
+        response, cache_info = await search_cache.get_or_fetch(
+            make_key(query, selected),
+            lambda: run_search(query, selected),
+            cacheable=is_complete_search
+        )
+        SEARCH_CACHE_LOOKUPS.inc(status=cache_info["status"])
+        return FastJSONResponse({**response, "cache": cache_info})
         
     except Exception as e:
         logger.error(f"Error in search_products: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if driver:
-            try:
-                driver.quit()
-                logger.info("Browser closed successfully")
-            except Exception as e:
-                logger.error(f"Error closing browser: {str(e)}")
-
-async def check_price_for_alert(alert_id: int, db: Session):
-    try:
-        # Get alert from database
-        alert = db.query(PriceAlert).filter(PriceAlert.id == alert_id).first()
-        if not alert or not alert.is_active:
-            return
-        
-        # Set up driver and scrape current price
-        driver = setup_driver()
-        try:
-            if "amazon.com" in alert.product_url:
-                results = scrape_amazon(driver, alert.product_title)
-            elif "walmart.com" in alert.product_url:
-                results = scrape_walmart(driver, alert.product_title)
-            elif "target.com" in alert.product_url:
-                results = scrape_target(driver, alert.product_title)
-            else:
-                logger.error(f"Unsupported website for alert {alert_id}")
-                return
-            
-            if results:
-                # Update current price
-                current_price = min(r.price for r in results)
-                alert.current_price = current_price
-                alert.last_checked = datetime.utcnow()
-                
-                # Check if price dropped below target
-                if current_price <= alert.target_price:
-                    # Send email notification
-                    try:
-                        sent = send_price_alert(
-                            alert.user_email,
-                            alert.product_title,
-                            current_price,
-                            alert.target_price,
-                            alert.product_url
-                        )
-                        if sent:
-                            alert.last_notified = datetime.utcnow()
-                    except Exception as e:
-                        logger.error(f"Failed to send email for alert {alert_id}: {str(e)}")
-                
-                db.commit()
-                
-        finally:
-            driver.quit()
-            
-    except Exception as e:
-        logger.error(f"Error checking price for alert {alert_id}: {str(e)}")
+
+def ndjson_line(event: dict) -> bytes:
+    return dumps(event) + b"\n"
+
+async def stream_search(query: str, selected: List[str]) -> AsyncIterator[bytes]:
+    key = make_key(query, selected)
+    cached = search_cache.peek(key)
+    if cached:
+        response, cache_info = cached
+        SEARCH_CACHE_LOOKUPS.inc(status=cache_info["status"])
+        for source, status in response["sources"].items():
+            results = [p for p in response["results"] if p.source == source]
+            yield ndjson_line({"type": "retailer", "source": source, **status, "results": results})
+        yield ndjson_line({"type": "summary", **response, "cache": cache_info})
+        return
+
+    # Emit each retailer's batch as soon as it finishes instead of waiting for the slowest
+    started = time.monotonic()
+    outcomes = []
+    for next_done in asyncio.as_completed([search_retailer(source, query, started) for source in selected]):
+        source, results, status = await next_done
+        outcomes.append((source, results, status))
+        yield ndjson_line({"type": "retailer", "source": source, **status, "results": results})
+
+    response = summarize_search(outcomes)
+    response["sources"] = {source: response["sources"][source] for source in selected}
+    if is_complete_search(response):
+        search_cache.put(key, response)
+    SEARCH_CACHE_LOOKUPS.inc(status="miss")
+    yield ndjson_line({"type": "summary", **response, "cache": {"status": "miss", "age": 0.0}})
+
+@app.get("/search/{query}/stream")
+async def stream_search_products(query: str, retailers: Optional[str] = None):
+    selected = parse_retailers(retailers)
+    logger.info(f"Received streaming search request for: {query}")
+    return StreamingResponse(stream_search(query, selected), media_type="application/x-ndjson")
+
+@app.post("/search", status_code=202)
+def submit_search(search: SearchJobCreate, db: Session = Depends(get_db)):
+    selected = parse_retailers(search.retailers)
+    cached = search_cache.peek(make_key(search.query, selected))
+    if cached:
+        response, cache_info = cached
+        SEARCH_CACHE_LOOKUPS.inc(status=cache_info["status"])
+        job = completed_search(db, search.query, selected, response)
+    else:
+        job = enqueue_search(db, search.query, selected)
+    logger.info(f"Queued search job {job.id} for: {search.query}")
+    return {"job_id": job.id, "status": job.status, "status_url": f"/search/jobs/{job.id}"}
+
+@app.get("/search/jobs/{job_id}")
+def get_search_job(job_id: str, db: Session = Depends(get_db)):
+    job = db.get(SearchJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Search job not found")
+    view = job_view(job)
+    if job.status == DONE and is_complete_search({"sources": job.progress}):
+        # Finished jobs warm the cache shared with GET /search/{query}
+        key = make_key(job.query, job.retailers)
+        if not search_cache.peek(key):
+            results = [ProductResult(**result) for result in job.results]
+            search_cache.put(key, {"results": results, "sources": job.progress})
+    return FastJSONResponse(view)
+
+@app.get("/metrics/search-cache")
+async def get_search_cache_metrics():
+    return search_cache.stats()
+
+@app.get("/metrics/search-workers")
+async def get_search_worker_metrics():
+    return search_workers.stats()
+
+def lookup_alert_price(product_url: str) -> Optional[float]:
+    # One product-page fetch per alert product instead of re-running a search
+    return lookup_product_price(product_url, driver_pool.lease)
+
+def sweep_due_alerts():
+    run_alert_sweep(lookup_alert_price)
+
+def check_alerts_now(alert_ids: List[int]):
+    run_alert_sweep(lookup_alert_price, alert_ids=alert_ids)
+
+# The sweep only triggers claims; schedules and leases live in the database,
+# so every worker process can run it without duplicating checks
+scheduler.add_job(
+    sweep_due_alerts,
+    'interval',
+    minutes=ALERT_SWEEP_INTERVAL_MINUTES,
+    id='alert_sweep',
+    replace_existing=True,
+    max_instances=1,
+    coalesce=True
+)
+
+@app.get("/metrics/alert-sweep")
+async def get_alert_sweep_metrics():
+    return alert_checker.last_sweep_report
+
+@app.get("/products/{product_id}/history")
+def get_product_history(
+    product_id: str,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    resolution: str = "day",
+    db: Session = Depends(get_db)
+):
+    if resolution not in ("raw", "hour", "day"):
+        raise HTTPException(status_code=400, detail="resolution must be one of: raw, hour, day")
+    # Stored times are naive UTC; "2026-10-01T00:00:00Z" and other aware inputs are converted
+    end = to_naive_utc(end) if end else datetime.utcnow()
+    start = to_naive_utc(start) if start else end - timedelta(days=90)
+    if start > end:
+        raise HTTPException(status_code=400, detail="from must not be later than to")
+    points = get_history(db, product_id, start, end, resolution)
+    return {"product_id": product_id, "resolution": resolution, "points": points}
 
 @app.post("/alerts/", response_model=AlertResponse)
-async def create_alert(alert: AlertCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+def create_alert(alert: AlertCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    product_url = normalize_product_url(alert.product_url)
+    product_ids = ensure_products(db, [(product_url, alert.product_title)])
     db_alert = PriceAlert(
         user_email=alert.user_email,
-        product_url=alert.product_url,
+        product_url=product_url,
         product_title=alert.product_title,
+        product_id=product_ids[product_url],
         target_price=alert.target_price,
         current_price=float('inf')
     )
@@ -717,37 +318,88 @@ async def create_alert(alert: AlertCreate, background_tasks: BackgroundTasks, db
     db.commit()
     db.refresh(db_alert)
     
-    # Schedule immediate price check
-    background_tasks.add_task(check_price_for_alert, db_alert.id, db)
-    
-    # Schedule recurring price check every 6 hours
-    scheduler.add_job(
-        check_price_for_alert,
-        'interval',
-        hours=6,
-        args=[db_alert.id, db],
-        id=f'alert_{db_alert.id}'
-    )
+    # Schedule immediate price check; later checks are picked up by the alert sweep
+    background_tasks.add_task(check_alerts_now, [db_alert.id])
     
     return db_alert
 
-@app.get("/alerts/", response_model=list[AlertResponse])
-async def get_alerts(email: str, db: Session = Depends(get_db)):
-    alerts = db.query(PriceAlert).filter(PriceAlert.user_email == email).all()
-    return alerts
+ALERT_BULK_MAX = int(os.getenv("ALERT_BULK_MAX", "10000"))
+ALERT_PAGE_SIZE = int(os.getenv("ALERT_PAGE_SIZE", "100"))
+ALERT_PAGE_MAX = int(os.getenv("ALERT_PAGE_MAX", "1000"))
+ALERT_FIELDS = list(AlertResponse.model_fields)
+
+@app.post("/alerts/bulk")
+def create_alerts_bulk(bulk: AlertBulkCreate, db: Session = Depends(get_db)):
+    if len(bulk.alerts) > ALERT_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {ALERT_BULK_MAX} alerts per request")
+    if not bulk.alerts:
+        return {"created": 0, "ids": []}
+
+    # One multi-row INSERT in one transaction; every row is due now, so the
+    # next sweep claims them in batches instead of one background check each
+    now = datetime.utcnow()
+    product_ids = ensure_products(db, [(alert.product_url, alert.product_title) for alert in bulk.alerts])
+    rows = [
+        {**alert.model_dump(), "product_url": normalize_product_url(alert.product_url),
+         "product_id": product_ids[alert.product_url], "current_price": float('inf'), "is_active": True,
+         "created_at": now, "last_checked": now, "next_check_at": now}
+        for alert in bulk.alerts
+    ]
+    ids = list(db.scalars(insert(PriceAlert).returning(PriceAlert.id), rows))
+    db.commit()
+    logger.info(f"Created {len(ids)} alerts in bulk")
+    return {"created": len(ids), "ids": ids}
+
+def parse_alert_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return ALERT_FIELDS
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in ALERT_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown alert fields: {', '.join(unknown)}")
+    # The id is the pagination cursor, so it is always included
+    return ["id"] + [name for name in requested if name != "id"]
+
+@app.get("/alerts/")
+def get_alerts(
+    request: Request,
+    email: str,
+    after: Optional[int] = None,
+    limit: int = Query(ALERT_PAGE_SIZE, ge=1, le=ALERT_PAGE_MAX),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    List a user's alerts in id order, one page at a time.
+
+    Pass the `X-Next-Cursor` response header back as `after` to fetch the
+    next page; it is absent on the last page. `fields` limits the columns
+    read and returned. Unchanged pages answer `If-None-Match` with 304.
+    """
+    selected = parse_alert_fields(fields)
+    query = db.query(*(getattr(PriceAlert, name) for name in selected)).filter(PriceAlert.user_email == email)
+    if after is not None:
+        query = query.filter(PriceAlert.id > after)
+    rows = query.order_by(PriceAlert.id).limit(limit + 1).all()
+    page = rows[:limit]
+
+    # orjson writes the infinite current price of unchecked alerts as null
+    body = dumps([dict(zip(selected, row)) for row in page])
+    headers = {"ETag": f'"{hashlib.sha256(body).hexdigest()[:32]}"', "Cache-Control": "no-cache"}
+    if len(rows) > limit:
+        headers["X-Next-Cursor"] = str(page[-1].id)
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if headers["ETag"] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.delete("/alerts/{alert_id}")
-async def delete_alert(alert_id: int, db: Session = Depends(get_db)):
+def delete_alert(alert_id: int, db: Session = Depends(get_db)):
     alert = db.query(PriceAlert).filter(PriceAlert.id == alert_id).first()
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     
-    # Remove scheduled job
-    try:
-        scheduler.remove_job(f'alert_{alert_id}')
-    except:
-        pass
-    
     # Delete alert from database
     db.delete(alert)
     db.commit()
@@ -0,0 +1,146 @@
+"""
+Simulated price drops caught by flat versus adaptive alert scheduling.
+
+Generates products whose prices change at very different rates (some sit
+still for months, some are repriced daily) with temporary sales, and one
+alert per product with a target a few to 30 percent below the regular
+price. Then replays --days of checks for:
+
+- flat: every product checked every ALERT_CHECK_INTERVAL_HOURS
+- adaptive: alert_schedule.desired_interval from the prices each policy has
+  observed, stretched by alert_schedule.budget_scale to the flat policy's
+  lookups per hour
+
+A drop is a stretch of time with the price at or below the target; it is
+caught when a check lands inside it. Reports lookups, drops caught and the
+mean delay from drop to detection.
+
+    python -m benchmarks.adaptive_schedule --products 2000 --days 30
+"""
+import argparse
+import heapq
+import random
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+from alert_schedule import ALERT_CHECK_INTERVAL_HOURS, ALERT_VOLATILITY_DAYS, budget_scale, desired_interval
+
+START = datetime(2026, 1, 1)
+# Price changes per day and typical sale length (hours) of each kind of product
+PRODUCT_KINDS = [(0.03, 48), (0.3, 24), (2.0, 8)]
+
+
+def generate(products: int, days: int, seed: int) -> list:
+    rng = random.Random(seed)
+    catalog = []
+    horizon = days * 24.0
+    for _ in range(products):
+        rate, sale_hours = rng.choice(PRODUCT_KINDS)
+        base = round(rng.uniform(20, 500), 2)
+        times, prices = [0.0], [base]
+        t = rng.expovariate(rate / 24)
+        while t < horizon:
+            # A sale for a while, then back to the regular price
+            times.append(t)
+            prices.append(round(base * (1 - rng.uniform(0.05, 0.35)), 2))
+            t += rng.expovariate(1 / sale_hours)
+            times.append(t)
+            prices.append(base)
+            t += rng.expovariate(rate / 24)
+        target = round(base * (1 - rng.uniform(0.03, 0.3)), 2)
+        catalog.append({"times": times, "prices": prices, "target": target})
+    return catalog
+
+
+def drops(product: dict, horizon: float) -> list:
+    """(start, end) hours during which the price is at or below the target."""
+    windows = []
+    times, prices = product["times"], product["prices"]
+    for index, (start, price) in enumerate(zip(times, prices)):
+        end = times[index + 1] if index + 1 < len(times) else horizon
+        if price <= product["target"] and start < horizon:
+            windows.append((start, min(end, horizon)))
+    return windows
+
+
+def price_at(product: dict, hour: float) -> float:
+    return product["prices"][bisect_right(product["times"], hour) - 1]
+
+
+def simulate(catalog: list, days: int, adaptive: bool, budget: float) -> dict:
+    horizon = days * 24.0
+    flat_hours = ALERT_CHECK_INTERVAL_HOURS
+    queue = [(random.Random(index).uniform(0, flat_hours), index) for index in range(len(catalog))]
+    heapq.heapify(queue)
+    checks = [[] for _ in catalog]
+    seen = [{"price": None, "changes": []} for _ in catalog]
+    desired_hours = [flat_hours] * len(catalog)
+    demand = len(catalog) / flat_hours
+
+    while queue:
+        hour, index = heapq.heappop(queue)
+        if hour >= horizon:
+            break
+        product = catalog[index]
+        checks[index].append(hour)
+        price = price_at(product, hour)
+        if not adaptive:
+            heapq.heappush(queue, (hour + flat_hours, index))
+            continue
+
+        state = seen[index]
+        if state["price"] is not None and state["price"] != price:
+            state["changes"].append(hour)
+        if state["price"] is None:
+            state["changes"] = []
+            state["first_seen"] = hour
+        state["price"] = price
+        window_start = hour - ALERT_VOLATILITY_DAYS * 24
+        recent = [t for t in state["changes"] if t >= window_start]
+        last_change = state["changes"][-1] if state["changes"] else state["first_seen"]
+
+        now = START + timedelta(hours=hour)
+        wanted = desired_interval(price, product["target"], len(recent), START + timedelta(hours=last_change), now)
+        wanted_hours = wanted.total_seconds() / 3600
+        demand += 1 / wanted_hours - 1 / desired_hours[index]
+        desired_hours[index] = wanted_hours
+        heapq.heappush(queue, (hour + wanted_hours * budget_scale(demand, budget), index))
+
+    caught = 0
+    delays = []
+    windows = 0
+    for product, times in zip(catalog, checks):
+        for start, end in drops(product, horizon):
+            windows += 1
+            position = bisect_right(times, start - 1e-9)
+            if position < len(times) and times[position] < end:
+                caught += 1
+                delays.append(times[position] - start)
+    return {
+        "lookups": sum(len(times) for times in checks),
+        "drops": windows,
+        "caught": caught,
+        "mean_delay_hours": sum(delays) / len(delays) if delays else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    catalog = generate(args.products, args.days, args.seed)
+    budget = args.products / ALERT_CHECK_INTERVAL_HOURS
+    print(f"{args.products} products, {args.days} days, budget {budget:.0f} lookups/hour")
+    print(f"{'policy':<10} {'lookups':>9} {'drops':>7} {'caught':>7} {'caught %':>9} {'mean delay h':>13}")
+    for name, adaptive in (("flat", False), ("adaptive", True)):
+        row = simulate(catalog, args.days, adaptive, budget)
+        share = row["caught"] / row["drops"] if row["drops"] else 0.0
+        print(f"{name:<10} {row['lookups']:>9} {row['drops']:>7} {row['caught']:>7} {share:>9.1%} "
+              f"{row['mean_delay_hours']:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Load test: latency of GET /alerts/ while N searches are in flight.
+
+Scrapers are replaced with stand-ins that block their thread for
+SCRAPE_SECONDS (like a real browser page load would), so no Chrome or
+network access is needed. Every search uses a query no earlier round has
+sent, so none is answered from the search cache, and the server writes to
+a temporary database rather than price_tracker.db.
+
+    python -m benchmarks.alerts_latency --searches 0 1 4 8
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import uvicorn
+
+# Before importing the app, which binds its engine to DATABASE_URL
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'alerts_latency.db')}"
+
+import app
+import search_service
+
+SCRAPE_SECONDS = 3.0
+PORT = 8765
+
+
+class _NullPool:
+    @contextmanager
+    def lease(self, timeout=None):
+        yield None
+
+    def warm(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _slow_scraper(source, query, deadline):
+    time.sleep(SCRAPE_SECONDS)
+    return []
+
+
+def start_server():
+    app.driver_pool = _NullPool()
+    app.search_workers.workers = 0
+    search_service.driver_pool = _NullPool()
+    search_service.try_static = lambda spec, query, deadline=None: None
+    search_service.scrape_with_pooled_driver = _slow_scraper
+    config = uvicorn.Config(app.app, host="127.0.0.1", port=PORT, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def measure(searches: int, samples: int) -> dict:
+    base = f"http://127.0.0.1:{PORT}"
+    search_pool = ThreadPoolExecutor(max_workers=max(searches, 1))
+    # Fresh queries per round: a cached search would not occupy a scrape thread
+    round_id = uuid.uuid4().hex[:8]
+    in_flight = [search_pool.submit(requests.get, f"{base}/search/bench-{round_id}-{i}") for i in range(searches)]
+    time.sleep(0.2)
+
+    latencies = []
+    session = requests.Session()
+    for _ in range(samples):
+        started = time.perf_counter()
+        session.get(f"{base}/alerts/", params={"email": "bench@example.com"})
+        latencies.append(time.perf_counter() - started)
+        time.sleep(SCRAPE_SECONDS / samples)
+
+    for future in in_flight:
+        future.result()
+    search_pool.shutdown()
+
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000,
+        "max": latencies[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, nargs="+", default=[0, 1, 4, 8])
+    parser.add_argument("--samples", type=int, default=50)
+    args = parser.parse_args()
+
+    server = start_server()
+    print(f"{'searches':>10} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for searches in args.searches:
+        result = measure(searches, args.samples)
+        print(f"{searches:>10} {result['p50']:>10.1f} {result['p99']:>10.1f} {result['max']:>10.1f}")
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
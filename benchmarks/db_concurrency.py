@@ -0,0 +1,173 @@
+"""
+Alert writes versus API reads on one database.
+
+Seeds a database with alerts, then runs writer threads that behave like
+alert sweeps (update a batch of alerts, append price observations, commit)
+alongside reader threads that behave like GET /alerts/ and the due-alert
+scan, for a fixed duration. Reports throughput, latency percentiles and
+failed operations ("database is locked") for each configuration.
+
+SQLite runs once per journal mode, each on a fresh temporary file; pass
+--url to measure another database (e.g. Postgres) instead. Seeding drops
+and recreates every table, so --url must point at a throwaway database and
+is refused without --drop-tables.
+
+    python -m benchmarks.db_concurrency --writers 2 --readers 8 --seconds 5
+    python -m benchmarks.db_concurrency --url postgresql+psycopg2://localhost/price_tracker_bench --drop-tables
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import make_url, update
+from sqlalchemy.orm import sessionmaker
+
+import models
+from catalog import ensure_products
+from price_history import record_observations
+
+USERS = 200
+BATCH = 20
+
+
+def seed(engine, alerts: int) -> list:
+    """Recreate the schema with `alerts` alerts, one product each; returns the product ids by alert id - 1."""
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    urls = [f"https://www.amazon.com/dp/BENCH{i:05d}" for i in range(alerts)]
+    # Observations reference products, so the catalog rows must exist first
+    product_ids = ensure_products(session, [(url, f"Product {i}") for i, url in enumerate(urls)])
+    session.add_all([
+        models.PriceAlert(
+            user_email=f"user{i % USERS}@example.com",
+            product_url=url,
+            product_id=product_ids[url],
+            product_title=f"Product {i}",
+            target_price=1.0,
+            current_price=100.0,
+        )
+        for i, url in enumerate(urls)
+    ])
+    session.commit()
+    session.close()
+    return [product_ids[url] for url in urls]
+
+
+def _percentile(values: list, share: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def _writer(Session, product_ids: list, deadline: float, rng: random.Random, stats: dict):
+    while time.perf_counter() < deadline:
+        ids = [rng.randrange(1, len(product_ids) + 1) for _ in range(BATCH)]
+        price = round(rng.uniform(50, 150), 2)
+        now = datetime.utcnow()
+        started = time.perf_counter()
+        db = Session()
+        try:
+            db.execute(
+                update(models.PriceAlert)
+                .where(models.PriceAlert.id.in_(ids))
+                .values(current_price=price, last_checked=now, next_check_at=now + timedelta(hours=6))
+                .execution_options(synchronize_session=False)
+            )
+            record_observations(db, [(product_ids[i - 1], "Amazon", price) for i in ids], observed_at=now)
+            db.commit()
+            stats["writes"].append(time.perf_counter() - started)
+        except Exception:
+            db.rollback()
+            stats["write_errors"] += 1
+        finally:
+            db.close()
+
+
+def _reader(Session, deadline: float, rng: random.Random, stats: dict):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        db = Session()
+        try:
+            if rng.random() < 0.8:
+                db.query(models.PriceAlert).filter(
+                    models.PriceAlert.user_email == f"user{rng.randrange(USERS)}@example.com"
+                ).all()
+            else:
+                db.query(models.PriceAlert.id).filter(
+                    models.PriceAlert.is_active == True,
+                    models.PriceAlert.next_check_at <= datetime.utcnow()
+                ).limit(100).all()
+            stats["reads"].append(time.perf_counter() - started)
+        except Exception:
+            stats["read_errors"] += 1
+        finally:
+            db.close()
+
+
+def run(engine, product_ids: list, writers: int, readers: int, seconds: float) -> dict:
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    stats = {"writes": [], "reads": [], "write_errors": 0, "read_errors": 0}
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=_writer, args=(Session, product_ids, deadline, random.Random(i), stats))
+        for i in range(writers)
+    ] + [
+        threading.Thread(target=_reader, args=(Session, deadline, random.Random(1000 + i), stats))
+        for i in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="throwaway database to measure instead of temporary SQLite files")
+    parser.add_argument("--drop-tables", action="store_true",
+                        help="confirm that every table in --url may be dropped and recreated")
+    parser.add_argument("--journal-modes", nargs="+", default=["delete", "wal"], help="SQLite journal modes to compare")
+    parser.add_argument("--alerts", type=int, default=5000)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.url and not args.drop_tables:
+        parser.error("seeding drops every table in --url; pass --drop-tables to confirm it is a throwaway database")
+    if args.url:
+        configs = [(make_url(args.url).get_backend_name(), lambda: models.create_db_engine(args.url))]
+    else:
+        directory = tempfile.mkdtemp()
+        configs = [
+            (f"sqlite/{mode}",
+             lambda mode=mode: models.create_db_engine(f"sqlite:///{os.path.join(directory, mode + '.db')}", mode))
+            for mode in args.journal_modes
+        ]
+
+    print(f"{'database':<14} {'writes/s':>9} {'write p95':>10} {'reads/s':>9} {'read p50':>9} {'read p95':>9} {'errors':>7}")
+    for name, make_engine in configs:
+        engine = make_engine()
+        product_ids = seed(engine, args.alerts)
+        stats = run(engine, product_ids, args.writers, args.readers, args.seconds)
+        engine.dispose()
+        errors = stats["write_errors"] + stats["read_errors"]
+        print(
+            f"{name:<14} {len(stats['writes']) / args.seconds:>9.1f} "
+            f"{_percentile(stats['writes'], 0.95) * 1000:>8.1f}ms "
+            f"{len(stats['reads']) / args.seconds:>9.1f} "
+            f"{statistics.median(stats['reads'] or [0]) * 1000:>7.1f}ms "
+            f"{_percentile(stats['reads'], 0.95) * 1000:>7.1f}ms {errors:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
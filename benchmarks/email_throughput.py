@@ -0,0 +1,132 @@
+"""
+Email throughput against a local SMTP stand-in.
+
+Starts a minimal in-process SMTP server that accepts every message, then
+sends the same batch of alert emails two ways:
+
+- one fresh connection per email (what send_price_alert used to do)
+- through EmailDispatcher, which reuses persistent connections
+
+and reports emails per second for each. The stand-in adds a fixed delay to
+the connection greeting to mimic a remote server's handshake cost.
+
+    python -m benchmarks.email_throughput --emails 500
+"""
+import argparse
+import asyncio
+import smtplib
+import threading
+import time
+
+from email_utils import EmailDispatcher, build_alert_message
+
+HOST = "127.0.0.1"
+PORT = 8025
+HANDSHAKE_DELAY = 0.02
+SENDER = "alerts@example.com"
+
+
+class SMTPStandIn:
+    """Accepts and discards mail; counts delivered messages."""
+
+    def __init__(self, host=HOST, port=PORT, handshake_delay=HANDSHAKE_DELAY):
+        self.host = host
+        self.port = port
+        self.handshake_delay = handshake_delay
+        self.delivered = 0
+        self._loop = None
+
+    async def _handle(self, reader, writer):
+        await asyncio.sleep(self.handshake_delay)
+        writer.write(b"220 localhost stand-in ready\r\n")
+        in_data = False
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    self.delivered += 1
+                    writer.write(b"250 OK queued\r\n")
+                continue
+            command = line.decode("ascii", "replace").strip().upper()
+            if command.startswith("EHLO"):
+                writer.write(b"250-localhost\r\n250 8BITMIME\r\n")
+            elif command.startswith("HELO"):
+                writer.write(b"250 localhost\r\n")
+            elif command.startswith("DATA"):
+                in_data = True
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command.startswith("QUIT"):
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            server = self._loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+            ready.set()
+            self._loop.run_until_complete(server.serve_forever())
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+
+
+def _messages(count):
+    return [
+        build_alert_message(SENDER, f"user{i}@example.com", [{
+            "product_title": f"Product {i}",
+            "current_price": 9.99,
+            "target_price": 10.0,
+            "product_url": f"https://www.amazon.com/dp/BENCH{i:06d}",
+        }])
+        for i in range(count)
+    ]
+
+
+def connection_per_email(messages):
+    for message in messages:
+        with smtplib.SMTP(HOST, PORT) as server:
+            server.send_message(message)
+
+
+def dispatcher(messages, connections):
+    sender = EmailDispatcher(SENDER, hostname=HOST, port=PORT, connections=connections)
+    futures = [sender.submit(message) for message in messages]
+    sent = sum(future.result() for future in futures)
+    sender.stop()
+    return sent, sender.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--connections", type=int, default=2)
+    args = parser.parse_args()
+
+    server = SMTPStandIn()
+    server.start()
+    messages = _messages(args.emails)
+
+    started = time.perf_counter()
+    connection_per_email(messages)
+    elapsed = time.perf_counter() - started
+    print(f"connection per email: {args.emails / elapsed:8.1f} emails/s ({elapsed:.2f}s)")
+
+    started = time.perf_counter()
+    sent, stats = dispatcher(messages, args.connections)
+    elapsed = time.perf_counter() - started
+    print(f"EmailDispatcher:      {sent / elapsed:8.1f} emails/s ({elapsed:.2f}s, {stats['connects']} connections)")
+    print(f"stand-in delivered {server.delivered} messages")
+
+
+if __name__ == "__main__":
+    main()
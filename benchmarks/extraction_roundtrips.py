@@ -0,0 +1,126 @@
+"""
+WebDriver round trips per search page: per-element extraction versus one script.
+
+Serves the saved search pages in benchmarks/fixtures from the local
+stand-in (benchmarks.fixture_server), loads each one in a real browser from
+search_service.setup_driver, and extracts the product cards two ways:
+
+- per element, one find_element/text/get_attribute command per selector per
+  card (how the scrapers worked before page_extract)
+- page_extract.extract_products, a single execute_script call
+
+Every WebDriver command goes through driver.execute, which is wrapped to
+count them. Reports commands, wall time and products found per retailer.
+Needs Chrome; no network access is required.
+
+    python -m benchmarks.extraction_roundtrips --repeat 5
+"""
+import argparse
+import time
+
+from selenium.webdriver.common.by import By
+
+from search_service import setup_driver
+from benchmarks.fixture_server import FixtureServer
+from page_extract import extract_products
+from price_parsing import extract_price
+from retailers import RETAILERS
+
+
+def _text(element, selector: str) -> str:
+    try:
+        return element.find_element(By.CSS_SELECTOR, selector).text
+    except Exception:
+        return ""
+
+
+def _attribute(element, selector: str, attribute: str) -> str:
+    try:
+        return element.find_element(By.CSS_SELECTOR, selector).get_attribute(attribute) or ""
+    except Exception:
+        return ""
+
+
+def extract_per_element(driver, spec: dict) -> list:
+    """The previous extraction loop: every field of every card is its own round trip."""
+    products = []
+    for selector in spec["product_selectors"]:
+        products = driver.find_elements(By.CSS_SELECTOR, selector)
+        if products:
+            break
+
+    items = []
+    for product in products[:spec["max_products"]]:
+        title = next((t for t in (_text(product, s) for s in spec["title_selectors"]) if t), "")
+        if not title:
+            continue
+        price = 0.0
+        for selector in spec["price_selectors"]:
+            price_text = _text(product, selector)
+            if price_text:
+                price = extract_price(price_text)
+                if price > 0:
+                    break
+        if price == 0:
+            continue
+        url = next((u for u in (_attribute(product, s, "href") for s in spec["url_selectors"]) if u), "")
+        if not url:
+            continue
+        image = next((i for i in (_attribute(product, s, "src") for s in spec["image_selectors"]) if i), None)
+        if spec["rating_selector"]:
+            if spec["rating_attribute"]:
+                _attribute(product, spec["rating_selector"], spec["rating_attribute"])
+            else:
+                _text(product, spec["rating_selector"])
+        if spec["reviews_selector"]:
+            _text(product, spec["reviews_selector"])
+        items.append({"title": title, "price": price, "url": url, "image_url": image})
+    return items
+
+
+class CommandCounter:
+    """Wraps driver.execute so every WebDriver command (including element commands) is counted."""
+
+    def __init__(self, driver):
+        self.count = 0
+        execute = driver.execute
+
+        def counted(*args, **kwargs):
+            self.count += 1
+            return execute(*args, **kwargs)
+
+        driver.execute = counted
+
+
+def run(driver, server: FixtureServer, repeat: int):
+    counter = CommandCounter(driver)
+    print(f"{'retailer':<10} {'method':<12} {'commands':>9} {'ms/page':>9} {'products':>9}")
+    for spec in RETAILERS.values():
+        driver.get(server.search_url(spec).format(query="fixture"))
+        for method, extract in (("per-element", extract_per_element), ("single-pass", extract_products)):
+            counter.count = 0
+            started = time.perf_counter()
+            for _ in range(repeat):
+                items = extract(driver, spec)
+            elapsed = (time.perf_counter() - started) / repeat
+            print(
+                f"{spec['name']:<10} {method:<12} {counter.count // repeat:>9} "
+                f"{elapsed * 1000:>9.1f} {len(items):>9}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=3, help="extractions per page and method")
+    args = parser.parse_args()
+
+    with FixtureServer() as server:
+        driver = setup_driver()
+        try:
+            run(driver, server, args.repeat)
+        finally:
+            driver.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Local HTTP stand-in for retailer sites, serving the recorded fixture pages.
+
+Each registered retailer gets two routes:
+
+- /<name>/search?q=...  serves fixtures/<name>_search.html
+- /<name>/product      serves fixtures/<name>_product.html
+
+With `page_assets=True` the pages also weigh what live ones do: absolute
+image URLs are served by the stand-in under /assets/<host>/<path>, and
+each page pulls in web fonts, a video and third-party tag/analytics
+scripts. Assets are filler bytes of a typical size for their type.
+
+`point_specs_at` rewrites the registered specs in place so the scrapers,
+scrape_amazon/scrape_walmart/scrape_target included, fetch from the
+stand-in instead of the live sites. Only benchmark processes should call it.
+"""
+import json
+import os
+import re
+import threading
+import http.server
+from urllib.parse import urlsplit
+
+from rate_limit import rate_limiter
+from retailers import RETAILERS
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# (content type, size in bytes) by file extension
+ASSET_TYPES = {
+    ".jpg": ("image/jpeg", 60000),
+    ".jpeg": ("image/jpeg", 60000),
+    ".gif": ("image/gif", 400),
+    ".woff2": ("font/woff2", 45000),
+    ".mp4": ("video/mp4", 750000),
+    ".js": ("application/javascript", 90000),
+    ".css": ("text/css", 2000),
+}
+
+# Typical third-party weight of a retailer results page, on top of product images
+PAGE_ASSETS = """
+<link rel="stylesheet" href="/assets/fonts.retailer-cdn.test/fonts.css">
+<script async src="/assets/www.googletagmanager.com/gtm.js"></script>
+<script async src="/assets/www.google-analytics.com/analytics.js"></script>
+<script async src="/assets/connect.facebook.net/fbevents.js"></script>
+<script async src="/assets/c.amazon-adsystem.com/apstag.js"></script>
+<img src="/assets/ad.doubleclick.net/pixel.gif" width="1" height="1" alt="">
+<video src="/assets/media.retailer-cdn.test/promo.mp4" autoplay muted playsinline></video>
+"""
+
+
+def fixture_path(filename: str) -> str:
+    return os.path.join(FIXTURES, filename)
+
+
+def load_expected() -> dict:
+    """Expected search results (title, price, URL path) and product-page price per retailer."""
+    with open(fixture_path("expected.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _asset_body(path: str) -> tuple:
+    content_type, size = ASSET_TYPES.get(os.path.splitext(path)[1].lower(), ("application/octet-stream", 1000))
+    if path.endswith(".css"):
+        body = "@font-face { font-family: Retail; src: url(/assets/fonts.retailer-cdn.test/retail.woff2); }\n"
+        body += "body { font-family: Retail, sans-serif; }\n"
+        return content_type, body.encode()
+    if path.endswith(".js"):
+        return content_type, b"/*" + b" " * (size - 4) + b"*/"
+    return content_type, b"\0" * size
+
+
+class _FixtureHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        if parts[0] == "assets" and len(parts) > 2:
+            content_type, body = _asset_body(self.path)
+            self._send(body, content_type)
+            return
+
+        filename = f"{parts[0]}_{parts[1]}.html" if len(parts) == 2 else ""
+        path = fixture_path(filename)
+        if parts[-1] not in ("search", "product") or not os.path.exists(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        if self.server.page_assets:
+            html = re.sub(r'(src|href)="https://([^"/]+)/', r'\1="/assets/\2/', body.decode("utf-8"))
+            body = html.replace("<body>", "<body>" + PAGE_ASSETS, 1).encode("utf-8")
+        self._send(body, "text/html; charset=utf-8")
+
+    def _send(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serves the fixture corpus on 127.0.0.1 from a background thread."""
+
+    def __init__(self, port: int = 0, page_assets: bool = False):
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", port), _FixtureHandler)
+        self._server.page_assets = page_assets
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-server", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def search_url(self, spec: dict) -> str:
+        return f"{self.base_url}/{spec['name'].lower()}/search?q={{query}}"
+
+    def product_url(self, spec: dict) -> str:
+        return f"{self.base_url}/{spec['name'].lower()}/product"
+
+
+def point_specs_at(server: FixtureServer):
+    """Send every registered retailer's traffic to the stand-in, without politeness delays."""
+    for spec in RETAILERS.values():
+        spec["search_url"] = server.search_url(spec)
+        spec["base_url"] = server.base_url
+        # One bucket per retailer keeps the stand-in's rate limiting independent
+        spec["domain"] = f"fixtures-{spec['name'].lower()}"
+        rate_limiter.configure(spec["domain"], requests_per_minute=600000, burst=1000)
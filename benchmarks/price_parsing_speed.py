@@ -0,0 +1,110 @@
+"""
+Microbenchmark for price_parsing on price strings scraped from the fixture pages.
+
+Each recorded search page in benchmarks/fixtures gives one page of cards,
+and each card has one price text per price selector of its retailer. These
+are the strings the static and in-page extractors read. The labelled
+strings in price_strings.json are added as one more page. Every page is
+parsed --pages times in turn, and the fastest of --rounds such runs is
+kept. The benchmark reports strings per second and card accuracy for:
+
+- the previous regex-on-stripped-string extract_price, one string at a time
+- extract_price, one string at a time
+- parse_prices, one call per page, the way page_extract calls it
+
+A card is correct when the first of its texts holding a price gives the
+expected price.
+
+    python -m benchmarks.price_parsing_speed --pages 500 --rounds 5
+"""
+import argparse
+import json
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.fixture_server import fixture_path, load_expected
+from price_parsing import current_price, extract_price, parse_prices
+from retailers import RETAILERS
+
+
+def legacy_extract_price(price_text: str) -> float:
+    if not price_text:
+        return 0.0
+    cleaned_text = price_text.replace('$', '').replace(',', '').strip()
+    price_match = re.search(r'\d+\.?\d*', cleaned_text)
+    return float(price_match.group()) if price_match else 0.0
+
+
+def _text(node, selector: str) -> str:
+    element = node.select_one(selector)
+    return element.get_text(" ", strip=True) if element else ""
+
+
+def load_pages() -> list:
+    """Every page as a list of (price texts, expected price) cards."""
+    expected = load_expected()
+    pages = []
+    for name, spec in RETAILERS.items():
+        with open(fixture_path(f"{name.lower()}_search.html"), encoding="utf-8") as f:
+            soup = BeautifulSoup(f.read(), "html.parser")
+        prices = {entry["title"]: entry["price"] for entry in expected[name]["search"]}
+        cards = next((soup.select(selector) for selector in spec["product_selectors"] if soup.select(selector)), [])
+        page = []
+        for card in cards:
+            title = next((text for text in (_text(card, s) for s in spec["title_selectors"]) if text), "")
+            if title in prices:
+                page.append(([_text(card, selector) for selector in spec["price_selectors"]], prices[title]))
+        pages.append(page)
+
+    with open(fixture_path("price_strings.json"), encoding="utf-8") as f:
+        pages.append([([entry["text"]], entry["amount"]) for entry in json.load(f)])
+    return pages
+
+
+def accuracy(page: list, prices: list) -> tuple:
+    """(correct cards, cards) given one price per text of the page, in order."""
+    correct = 0
+    prices = iter(prices)
+    for texts, expected in page:
+        card_prices = [next(prices) for _ in texts]
+        price = next((price for price in card_prices if price > 0), 0.0)
+        correct += abs(price - expected) < 0.005
+    return correct, len(page)
+
+
+def batch(texts: list) -> list:
+    return [record.amount if record else 0.0 for record in map(current_price, parse_prices(texts))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=500, help="times each fixture page is parsed per round")
+    parser.add_argument("--rounds", type=int, default=5, help="runs per parser; the fastest is reported")
+    args = parser.parse_args()
+
+    pages = load_pages()
+    page_texts = [[text for texts, _ in page for text in texts] for page in pages]
+    strings = sum(map(len, page_texts)) * args.pages
+
+    print(f"{'parser':<26} {'strings/s':>12} {'accuracy':>9}")
+    for name, run in (
+        ("legacy extract_price", lambda texts: [legacy_extract_price(text) for text in texts]),
+        ("extract_price", lambda texts: [extract_price(text) for text in texts]),
+        ("parse_prices (per page)", batch),
+    ):
+        elapsed = float("inf")
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            for _ in range(args.pages):
+                for texts in page_texts:
+                    run(texts)
+            elapsed = min(elapsed, time.perf_counter() - started)
+        scores = [accuracy(page, run(texts)) for page, texts in zip(pages, page_texts)]
+        correct = sum(score[0] for score in scores) / sum(score[1] for score in scores)
+        print(f"{name:<26} {strings / elapsed:>12,.0f} {correct:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
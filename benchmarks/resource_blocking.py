@@ -0,0 +1,79 @@
+"""
+Bytes transferred and page load time with and without resource blocking.
+
+Serves the fixture pages from the local stand-in with their live-site
+weight (product images, web fonts, a video, tag manager and analytics
+scripts; see benchmarks.fixture_server), loads each retailer's search page
+in a browser from search_service.setup_driver with the browser cache
+disabled, and compares:
+
+- unblocked: every resource loads
+- blocked: scrape_engine.blocked_url_patterns for the retailer, as applied
+  before every scrape
+
+Bytes and timings come from the page's Resource Timing entries. Products
+are extracted in both modes to confirm blocking does not change results.
+Needs Chrome; no network access is required.
+
+    python -m benchmarks.resource_blocking --repeat 5
+"""
+import argparse
+import statistics
+
+from search_service import setup_driver
+from benchmarks.fixture_server import FixtureServer
+from page_extract import extract_products
+from retailers import RETAILERS
+from scrape_engine import blocked_url_patterns
+
+PAGE_WEIGHT_SCRIPT = """
+const navigation = performance.getEntriesByType("navigation")[0];
+const resources = performance.getEntriesByType("resource");
+return [
+    navigation.transferSize + resources.reduce((total, entry) => total + entry.transferSize, 0),
+    resources.length,
+    navigation.loadEventEnd - navigation.startTime,
+];
+"""
+
+
+def measure(driver, url: str, spec: dict, patterns: list, repeat: int) -> dict:
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    transferred, requests, load_ms = [], [], []
+    for _ in range(repeat):
+        driver.get(url)
+        size, count, elapsed = driver.execute_script(PAGE_WEIGHT_SCRIPT)
+        transferred.append(size)
+        requests.append(count)
+        load_ms.append(elapsed)
+    return {
+        "bytes": statistics.mean(transferred),
+        "requests": statistics.mean(requests),
+        "load_ms": statistics.median(load_ms),
+        "products": len(extract_products(driver, spec)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5, help="page loads per retailer and mode")
+    args = parser.parse_args()
+
+    driver = setup_driver()
+    try:
+        with FixtureServer(page_assets=True) as server:
+            print(f"{'retailer':<10} {'mode':<10} {'KB':>9} {'requests':>9} {'load ms':>9} {'products':>9}")
+            for name, spec in RETAILERS.items():
+                url = server.search_url(spec).format(query="fixture")
+                for mode, patterns in (("unblocked", []), ("blocked", blocked_url_patterns(spec))):
+                    row = measure(driver, url, spec, patterns, args.repeat)
+                    print(f"{name:<10} {mode:<10} {row['bytes'] / 1024:>9.1f} {row['requests']:>9.1f} "
+                          f"{row['load_ms']:>9.1f} {row['products']:>9}")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
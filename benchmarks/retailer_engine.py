@@ -0,0 +1,43 @@
+"""
+Offline throughput of the shared parsing engine for every registered retailer.
+
+Each spec in retailers.RETAILERS is run through http_scraper's
+parse_search_results against its saved search page,
+benchmarks/fixtures/<name>_search.html, and the parse rate and product
+count are reported. A newly registered retailer only needs a fixture to be
+covered. No browser or network access is needed.
+
+    python -m benchmarks.retailer_engine --repeat 200
+"""
+import argparse
+import os
+import time
+
+from benchmarks.fixture_server import fixture_path
+from http_scraper import parse_search_results
+from retailers import RETAILERS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=100, help="parses per retailer")
+    args = parser.parse_args()
+
+    print(f"{'retailer':<10} {'products':>9} {'ms/page':>9} {'pages/s':>9}")
+    for name, spec in RETAILERS.items():
+        path = fixture_path(f"{name.lower()}_search.html")
+        if not os.path.exists(path):
+            print(f"{name:<10} no fixture at {os.path.relpath(path)}")
+            continue
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            items = parse_search_results(html, spec)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        print(f"{name:<10} {len(items):>9} {elapsed * 1000:>9.2f} {1 / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
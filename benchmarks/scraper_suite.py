@@ -0,0 +1,167 @@
+"""
+Scraper benchmark against the recorded fixture corpus, with no network.
+
+Starts the local stand-in (benchmarks.fixture_server), points every
+registered retailer at it and measures:
+
+- static tier: search page fetch ("navigate") and selector parse ("extract"),
+  plus the product-page price lookup used by alert checks
+- browser tier (--browser, needs Chrome): the engine behind
+  scrape_amazon/scrape_walmart/scrape_target, timed per stage
+  (navigate, wait, scroll, extract)
+- extract_price over benchmarks/fixtures/price_strings.json
+
+Accuracy is the share of expected products (title, price and URL path from
+fixtures/expected.json) that were extracted exactly. Exits non-zero when
+accuracy falls below --min-accuracy, so it can guard against selector
+regressions in CI.
+
+    python -m benchmarks.scraper_suite --repeat 20
+    python -m benchmarks.scraper_suite --browser --repeat 3
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from benchmarks.fixture_server import FixtureServer, fixture_path, load_expected, point_specs_at
+from http_scraper import fetch_html, parse_search_results
+from price_parsing import extract_price
+from product_page import extract_product_price
+from retailers import RETAILERS
+from scrape_engine import scrape_search
+
+QUERY = "fixture"
+
+
+def search_accuracy(items: list, expected: list) -> float:
+    found = {(item["title"], item["price"], urlsplit(item["url"]).path) for item in items}
+    wanted = [(e["title"], e["price"], e["path"]) for e in expected]
+    matched = sum(1 for key in wanted if key in found)
+    return matched / max(len(wanted), len(items), 1)
+
+
+def run_static(server: FixtureServer, expected: dict, repeat: int) -> dict:
+    report = {}
+    for name, spec in RETAILERS.items():
+        stages = defaultdict(list)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            html = fetch_html(spec["search_url"].format(query=QUERY), spec)
+            t1 = time.perf_counter()
+            items = parse_search_results(html, spec)
+            t2 = time.perf_counter()
+            stages["navigate"].append(t1 - t0)
+            stages["extract"].append(t2 - t1)
+        elapsed = time.perf_counter() - started
+
+        t0 = time.perf_counter()
+        price = extract_product_price(fetch_html(server.product_url(spec), spec), spec)
+        product_seconds = time.perf_counter() - t0
+
+        report[name] = {
+            "pages_per_second": repeat / elapsed,
+            "stages": {stage: statistics.mean(values) for stage, values in stages.items()},
+            "products": len(items),
+            "accuracy": search_accuracy(items, expected[name]["search"]),
+            "product_price_ok": price == expected[name]["product_price"],
+            "product_seconds": product_seconds,
+        }
+    return report
+
+
+def run_browser(expected: dict, repeat: int) -> dict:
+    from search_service import setup_driver
+
+    driver = setup_driver()
+    report = {}
+    try:
+        for name, spec in RETAILERS.items():
+            stages = defaultdict(list)
+            started = time.perf_counter()
+            for _ in range(repeat):
+                timings = {}
+                items = scrape_search(driver, spec, QUERY, timings)
+                for stage, seconds in timings.items():
+                    stages[stage].append(seconds)
+            elapsed = time.perf_counter() - started
+            report[name] = {
+                "pages_per_second": repeat / elapsed,
+                "stages": {stage: statistics.mean(values) for stage, values in stages.items()},
+                "products": len(items),
+                "accuracy": search_accuracy(items, expected[name]["search"]),
+            }
+    finally:
+        driver.quit()
+    return report
+
+
+def run_prices(repeat: int) -> dict:
+    with open(fixture_path("price_strings.json"), encoding="utf-8") as f:
+        corpus = json.load(f)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        parsed = [extract_price(entry["text"]) for entry in corpus]
+    elapsed = time.perf_counter() - started
+    correct = sum(1 for entry, price in zip(corpus, parsed) if abs(price - entry["amount"]) < 0.005)
+    return {
+        "strings": len(corpus),
+        "strings_per_second": len(corpus) * repeat / elapsed,
+        "accuracy": correct / len(corpus),
+        "misses": [entry["text"] for entry, price in zip(corpus, parsed) if abs(price - entry["amount"]) >= 0.005],
+    }
+
+
+def print_tier(title: str, report: dict):
+    print(title)
+    print(f"  {'retailer':<10} {'pages/s':>9} {'products':>9} {'accuracy':>9}  stage means (ms)")
+    for name, row in report.items():
+        stages = ", ".join(f"{stage} {seconds * 1000:.2f}" for stage, seconds in row["stages"].items())
+        line = f"  {name:<10} {row['pages_per_second']:>9.1f} {row['products']:>9} {row['accuracy']:>9.0%}  {stages}"
+        if "product_price_ok" in row:
+            line += f"; product page {'ok' if row['product_price_ok'] else 'WRONG'} {row['product_seconds'] * 1000:.2f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=10, help="pages fetched per retailer and tier")
+    parser.add_argument("--browser", action="store_true", help="also run the Selenium tier (needs Chrome)")
+    parser.add_argument("--min-accuracy", type=float, default=1.0,
+                        help="fail when any retailer's search accuracy is below this")
+    args = parser.parse_args()
+
+    expected = load_expected()
+    with FixtureServer() as server:
+        point_specs_at(server)
+        tiers = {"static": run_static(server, expected, args.repeat)}
+        if args.browser:
+            tiers["browser"] = run_browser(expected, args.repeat)
+
+    for tier, report in tiers.items():
+        print_tier(f"{tier} tier", report)
+
+    prices = run_prices(args.repeat * 100)
+    print("extract_price")
+    print(f"  {prices['strings']} strings, {prices['strings_per_second']:,.0f} strings/s, "
+          f"accuracy {prices['accuracy']:.0%}")
+    for text in prices["misses"]:
+        print(f"  miss: {text!r}")
+
+    failed = [
+        f"{tier}/{name}"
+        for tier, report in tiers.items()
+        for name, row in report.items()
+        if row["accuracy"] < args.min_accuracy or row.get("product_price_ok") is False
+    ]
+    if failed:
+        print(f"Accuracy regression: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
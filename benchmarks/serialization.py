@@ -0,0 +1,109 @@
+"""
+Serialization time and bytes on the wire for a search response.
+
+Builds a search response like GET /search/{query} returns: --results
+ProductResult models (15 per retailer by default) with the per-retailer
+statuses and cache info. Serializes it:
+
+- default: FastAPI's path before FastJSONResponse, jsonable_encoder and then
+  json.dumps as starlette's JSONResponse renders it
+- orjson: json_response.dumps, as FastJSONResponse renders it
+
+and reports the time per response, then the body size uncompressed and
+with each encoding CompressionMiddleware can apply at its configured
+level, with the time compression adds.
+
+    python -m benchmarks.serialization --results 45
+"""
+import argparse
+import json
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from compression import SUPPORTED_ENCODINGS, make_compressor
+from json_response import dumps
+from retailers import RETAILERS
+from search_service import ProductResult
+
+WORDS = [
+    "Samsung", "Sony", "LG", "TCL", "Hisense", "Vizio", "55-Inch", "65-Inch", "4K", "UHD", "Smart", "TV",
+    "QLED", "OLED", "HDR", "Google", "Fire", "Roku", "Class", "Series", "LED", "Crystal", "Dolby", "Vision",
+]
+
+
+def search_response(results: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    sources = list(RETAILERS)
+    products = []
+    for index in range(results):
+        source = sources[index % len(sources)]
+        product_id = f"{source.lower()}:{rng.randrange(10**9, 10**10)}"
+        products.append(ProductResult(
+            title=" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))),
+            price=round(rng.uniform(150, 1500), 2),
+            url=f"https://www.{source.lower()}.com/p/{product_id.split(':')[1]}",
+            source=source,
+            image_url=f"https://images.{source.lower()}.com/is/image/{rng.getrandbits(64):016x}.jpg",
+            rating=round(rng.uniform(3, 5), 1),
+            reviews_count=rng.randint(0, 20000),
+            product_id=product_id,
+        ))
+    products.sort(key=lambda p: p.price)
+    statuses = {
+        source: {"status": "ok", "count": sum(p.source == source for p in products), "elapsed": 4.2}
+        for source in sources
+    }
+    return {"results": products, "sources": statuses, "cache": {"status": "miss", "age": 0.0}}
+
+
+def default_render(content: dict) -> bytes:
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def per_call(fn, arg, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - started) / repeat
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    compressor = make_compressor(encoding)
+    return compressor.compress(body) + compressor.finish()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--results", type=int, default=45)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    response = search_response(args.results, args.seed)
+    default_body = default_render(response)
+    orjson_body = dumps(response)
+    assert json.loads(default_body) == json.loads(orjson_body), "serializers disagree"
+
+    print(f"Search response with {args.results} results")
+    print(f"{'serializer':<12} {'us/response':>12} {'bytes':>8}")
+    default_time = per_call(default_render, response, args.repeat)
+    orjson_time = per_call(dumps, response, args.repeat)
+    print(f"{'default':<12} {default_time * 1e6:>12.1f} {len(default_body):>8}")
+    print(f"{'orjson':<12} {orjson_time * 1e6:>12.1f} {len(orjson_body):>8}")
+    print(f"orjson speedup: {default_time / orjson_time:.1f}x")
+
+    print()
+    print(f"{'encoding':<12} {'bytes':>8} {'ratio':>7} {'us to compress':>15}")
+    print(f"{'identity':<12} {len(orjson_body):>8} {1.0:>7.2f} {0.0:>15.1f}")
+    for encoding in SUPPORTED_ENCODINGS:
+        size = len(compress(encoding, orjson_body))
+        seconds = per_call(lambda body: compress(encoding, body), orjson_body, max(args.repeat // 10, 1))
+        print(f"{encoding:<12} {size:>8} {size / len(orjson_body):>7.2f} {seconds * 1e6:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+API startup time: importing app and booting until /healthz answers.
+
+Runs `python -X importtime -c "import app"` in fresh processes and reports
+the median time to import the app, the modules it imports that take the
+longest, and whether any scraping module that should load lazily on the
+first scrape (selenium.webdriver, undetected_chromedriver, webdriver_manager,
+bs4) was imported. Then starts uvicorn with app:app (no search worker
+processes, a temporary database) and measures the time until GET /healthz
+answers; browsers warm in the background and are not waited for.
+
+Exits non-zero when a lazy module is imported eagerly or a median exceeds
+its threshold, so it can run in CI:
+
+    python -m benchmarks.startup_time --runs 5 --max-import-ms 2500 --max-ready-ms 5000
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ("selenium.webdriver", "undetected_chromedriver", "webdriver_manager", "bs4")
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _env(directory: str) -> dict:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'startup.db')}"
+    env["SEARCH_WORKERS"] = "0"
+    return env
+
+
+def measure_import(directory: str) -> dict:
+    """One fresh `import app`; returns its cumulative time and per-module times (microseconds)."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, env=_env(directory), capture_output=True, text=True, check=True
+    )
+    modules = {}
+    direct = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative, depth, name = int(match.group(2)), len(match.group(3)) // 2, match.group(4)
+        modules[name] = cumulative
+        if depth == 1:
+            # Children are listed before their parent, so these are the app's own imports
+            direct[name] = cumulative
+    return {"total": modules["app"], "direct": direct, "modules": modules}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_ready(directory: str, timeout: float = 60) -> float:
+    """Seconds from starting uvicorn until GET /healthz returns 200."""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=_env(directory), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/healthz", timeout=1).status_code == 200:
+                    return time.perf_counter() - started
+            except requests.ConnectionError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            time.sleep(0.01)
+        raise RuntimeError(f"/healthz did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest direct imports to list")
+    parser.add_argument("--max-import-ms", type=float, default=2500,
+                        help="fail when the median import of app takes longer")
+    parser.add_argument("--max-ready-ms", type=float, default=5000,
+                        help="fail when the median time until /healthz answers is longer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        imports = [measure_import(directory) for _ in range(args.runs)]
+        ready = [measure_ready(directory) for _ in range(args.runs)]
+
+    import_ms = statistics.median(run["total"] for run in imports) / 1000
+    ready_ms = statistics.median(ready) * 1000
+    print(f"import app: median {import_ms:.0f} ms over {args.runs} runs")
+    last = imports[-1]
+    for name, cumulative in sorted(last["direct"].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<32} {cumulative / 1000:>8.1f} ms")
+    print(f"start to /healthz: median {ready_ms:.0f} ms")
+
+    eager = sorted(
+        name for name in last["modules"]
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    )
+    failed = []
+    if eager:
+        failed.append(f"imported at startup: {', '.join(eager)}")
+    if import_ms > args.max_import_ms:
+        failed.append(f"import {import_ms:.0f} ms > {args.max_import_ms:.0f} ms")
+    if ready_ms > args.max_ready_ms:
+        failed.append(f"ready {ready_ms:.0f} ms > {args.max_ready_ms:.0f} ms")
+    if failed:
+        print(f"Startup regression: {'; '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Alert sweep throughput versus number of worker processes.
+
+Seeds a temporary SQLite database with alerts, then lets N processes claim
+and check them concurrently through alert_checker.run_alert_sweep. Price
+lookups are replaced with a fixed delay standing in for a product-page
+fetch. Reports alerts checked per second and verifies no alert was checked
+more than once.
+
+    python -m benchmarks.sweep_workers --alerts 2000 --workers 1 2 4 8
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+import alert_checker
+import models
+
+LOOKUP_SECONDS = 0.01
+
+
+def _engine(path):
+    return models.create_db_engine(f"sqlite:///{path}")
+
+
+def _worker(path, batch_size, queue):
+    models.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine(path))
+    alert_checker.send_alert_digests = lambda notifications: {}
+    checked = []
+
+    def lookup(url):
+        checked.append(url)
+        time.sleep(LOOKUP_SECONDS)
+        return 100.0
+
+    report = alert_checker.run_alert_sweep(lookup, batch_size=batch_size)
+    queue.put((report["alerts"], checked))
+
+
+def seed(path, alerts):
+    engine = _engine(path)
+    models.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        models.PriceAlert(
+            user_email=f"user{i}@example.com",
+            product_url=f"https://www.amazon.com/dp/BENCH{i:06d}",
+            product_title=f"Product {i}",
+            target_price=1.0,
+            current_price=float("inf"),
+        )
+        for i in range(alerts)
+    ])
+    session.commit()
+    session.close()
+    return engine
+
+
+def run(path, engine, workers, batch_size):
+    with engine.begin() as conn:
+        conn.execute(update(models.PriceAlert).values(
+            next_check_at=datetime.utcnow(), lease_owner=None, lease_expires_at=None
+        ))
+    queue = multiprocessing.Queue()
+    started = time.perf_counter()
+    processes = [multiprocessing.Process(target=_worker, args=(path, batch_size, queue)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    checked = [url for _, urls in results for url in urls]
+    return sum(count for count, _ in results), elapsed, len(checked) - len(set(checked))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "sweep_bench.db")
+    engine = seed(path, args.alerts)
+    print(f"{'workers':>8} {'alerts':>8} {'seconds':>8} {'alerts/s':>10} {'duplicates':>11}")
+    for workers in args.workers:
+        checked, elapsed, duplicates = run(path, engine, workers, args.batch_size)
+        print(f"{workers:>8} {checked:>8} {elapsed:>8.2f} {checked / elapsed:>10.1f} {duplicates:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Product catalog.
+
+Every product URL that enters the system (search results, new alerts) is
+normalized first, so tracking parameters, ref tags and ad redirects
+collapse to one canonical URL per retailer product. Each product then has
+a single `products` row keyed by product_id_for_url, which alerts and price
+observations reference; sweeps and history group on that id instead of on
+raw URLs.
+"""
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select, update
+
+from models import PriceAlert, Product
+from retailers import canonical_product, normalize_product_url, product_id_for_url, retailer_for_url
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def product_row(url: str, title: Optional[str] = None) -> dict:
+    """Catalog row for a product URL, normalized the same way as on ingest."""
+    url = normalize_product_url(url)
+    product = canonical_product(url)
+    spec = product[0] if product else retailer_for_url(url)
+    return {
+        "id": product_id_for_url(url),
+        "retailer": spec["name"] if spec else None,
+        "retailer_product_id": product[1] if product else None,
+        "url": url,
+        "title": title,
+    }
+
+
+def _insert_missing(db, rows: list):
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        existing = set(db.scalars(select(Product.id).where(Product.id.in_([row["id"] for row in rows]))))
+        db.add_all([Product(**row) for row in rows if row["id"] not in existing])
+        db.flush()
+        return
+    # Concurrent searches and sweeps may register the same product at once
+    db.execute(insert(Product).on_conflict_do_nothing(), rows)
+
+
+def ensure_products(db, products: Iterable[Tuple[str, Optional[str]]]) -> Dict[str, str]:
+    """
+    Register products that are not in the catalog yet.
+
+    Args:
+        db: SQLAlchemy session; the caller commits
+        products: (url, title) pairs; URLs may be raw or normalized
+
+    Returns:
+        Dict[str, str]: product id for every input URL
+    """
+    rows = {}
+    ids = {}
+    for url, title in products:
+        row = product_row(url, title)
+        rows.setdefault(row["id"], row)
+        ids[url] = row["id"]
+    if rows:
+        _insert_missing(db, list(rows.values()))
+    return ids
+
+
+def link_alert_products(db, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Normalize the URLs of alerts created before the catalog existed and link them to their products.
+
+    Returns:
+        int: Number of alerts linked
+    """
+    linked = 0
+    while True:
+        alerts = db.execute(
+            select(PriceAlert.id, PriceAlert.product_url, PriceAlert.product_title)
+            .where(PriceAlert.product_id == None)
+            .limit(batch_size)
+        ).all()
+        if not alerts:
+            break
+        ids = ensure_products(db, [(alert.product_url, alert.product_title) for alert in alerts])
+        for alert in alerts:
+            db.execute(
+                update(PriceAlert)
+                .where(PriceAlert.id == alert.id)
+                .values(product_id=ids[alert.product_url], product_url=normalize_product_url(alert.product_url))
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        linked += len(alerts)
+    if linked:
+        logger.info(f"Linked {linked} existing alerts to catalog products")
+    return linked
@@ -0,0 +1,246 @@
+import os
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "3"))
+DRIVER_POOL_MAX_USES = int(os.getenv("DRIVER_POOL_MAX_USES", "25"))
+DRIVER_POOL_MAX_WAITERS = int(os.getenv("DRIVER_POOL_MAX_WAITERS", "10"))
+DRIVER_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DRIVER_POOL_ACQUIRE_TIMEOUT", "60"))
+# Page-load and script timeouts a browser returns to; scrapes shorten them to their deadline
+DRIVER_PAGE_LOAD_TIMEOUT = float(os.getenv("DRIVER_PAGE_LOAD_TIMEOUT", "30"))
+
+ACQUIRE_SECONDS = metrics.histogram(
+    "price_tracker_driver_acquire_seconds",
+    "Time from requesting a pooled browser to holding a healthy one"
+)
+
+
+class PoolExhausted(Exception):
+    """Raised when no driver can be leased within the wait-queue limits."""
+
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+
+class DriverPool:
+    """
+    Bounded pool of warm Chrome instances with lease/return semantics.
+
+    Drivers are health-checked when leased, have their cookies, storage,
+    extra headers and user-agent override reset when returned, and are
+    recycled after `max_uses` leases or as soon as a lease ends with a
+    WebDriver error.
+    """
+
+    def __init__(self, factory: Callable, size: int = DRIVER_POOL_SIZE,
+                 max_uses: int = DRIVER_POOL_MAX_USES,
+                 max_waiters: int = DRIVER_POOL_MAX_WAITERS,
+                 acquire_timeout: float = DRIVER_POOL_ACQUIRE_TIMEOUT):
+        self._factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.max_waiters = max_waiters
+        self.acquire_timeout = acquire_timeout
+
+        self._cond = threading.Condition()
+        self._idle: list = []
+        self._total = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._created = 0
+        self._recycled = 0
+        self._leases = 0
+        self._lease_latencies = deque(maxlen=500)
+
+    def _create(self) -> _PooledDriver:
+        driver = self._factory()
+        driver.set_page_load_timeout(DRIVER_PAGE_LOAD_TIMEOUT)
+        driver.set_script_timeout(DRIVER_PAGE_LOAD_TIMEOUT)
+        with self._cond:
+            self._created += 1
+        return _PooledDriver(driver)
+
+    def _discard(self, pooled: _PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.error(f"Error closing pooled browser: {str(e)}")
+        with self._cond:
+            self._total -= 1
+            self._recycled += 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_healthy(pooled: _PooledDriver) -> bool:
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(pooled: _PooledDriver):
+        driver = pooled.driver
+        # Undo a lease's deadline-bound timeouts before loading about:blank with them
+        driver.set_page_load_timeout(DRIVER_PAGE_LOAD_TIMEOUT)
+        driver.set_script_timeout(DRIVER_PAGE_LOAD_TIMEOUT)
+        try:
+            driver.execute_script("window.localStorage.clear();")
+            driver.execute_script("window.sessionStorage.clear();")
+        except WebDriverException:
+            # Storage is not accessible on about:blank or opaque origins
+            pass
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.delete_all_cookies()
+        # Retailer-specific headers and UA overrides would otherwise follow the browser to the next retailer;
+        # an empty user agent removes the override and restores the one the browser was launched with
+        driver.execute_cdp_cmd("Network.setExtraHTTPHeaders", {"headers": {}})
+        driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": ""})
+        driver.get("about:blank")
+
+    def warm(self):
+        """Launch browsers until the pool holds `size` instances."""
+        while True:
+            with self._cond:
+                if self._closed or self._total >= self.size:
+                    return
+                self._total += 1
+            try:
+                pooled = self._create()
+            except Exception as e:
+                logger.error(f"Error pre-warming browser: {str(e)}")
+                with self._cond:
+                    self._total -= 1
+                return
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    def acquire(self, timeout: Optional[float] = None) -> _PooledDriver:
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        with self._cond:
+            if self._closed:
+                raise PoolExhausted("Driver pool is closed")
+            if self._waiting >= self.max_waiters:
+                raise PoolExhausted(f"Driver pool wait queue is full ({self.max_waiters} waiting)")
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._total < self.size:
+                        self._total += 1
+                        pooled = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhausted(f"Timed out after {timeout}s waiting for a browser")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+        if pooled is None:
+            try:
+                pooled = self._create()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+        elif not self._is_healthy(pooled):
+            logger.warning("Pooled browser failed health check, replacing it")
+            self._discard(pooled)
+            return self.acquire(max(deadline - time.monotonic(), 0))
+
+        pooled.uses += 1
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._leases += 1
+            self._lease_latencies.append(elapsed)
+        ACQUIRE_SECONDS.observe(elapsed)
+        return pooled
+
+    def release(self, pooled: _PooledDriver, broken: bool = False):
+        if not broken and not self._closed and pooled.uses < self.max_uses:
+            try:
+                self._reset(pooled)
+            except Exception as e:
+                logger.warning(f"Failed to reset pooled browser: {str(e)}")
+                broken = True
+        else:
+            broken = True
+
+        if broken:
+            self._discard(pooled)
+            return
+
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        pooled = self.acquire(timeout)
+        broken = False
+        try:
+            yield pooled.driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(pooled, broken=broken)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self) -> dict:
+        with self._cond:
+            latencies = sorted(self._lease_latencies)
+            idle = len(self._idle)
+            stats = {
+                "size": self.size,
+                "total": self._total,
+                "idle": idle,
+                "leased": self._total - idle,
+                "waiting": self._waiting,
+                "max_waiters": self.max_waiters,
+                "created": self._created,
+                "recycled": self._recycled,
+                "leases": self._leases,
+            }
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        stats["lease_latency_seconds"] = {
+            "avg": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": latencies[-1] if latencies else 0.0,
+        }
+        return stats
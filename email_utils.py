@@ -1,10 +1,18 @@
 import os
-import smtplib
+import time
+import asyncio
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from typing import Dict, List, Optional
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
+import aiosmtplib
 import logging
 
+import metrics
+
 # Load environment variables
 load_dotenv()
 
@@ -27,47 +35,311 @@ def send_price_alert(user_email: str, product_title: str, current_price: float,
         bool: True if email was sent successfully, False otherwise
     """
     try:
-        # Get email credentials from environment variables
-        sender_email = os.getenv("EMAIL_ADDRESS")
-        sender_password = os.getenv("EMAIL_PASSWORD")
-        
-        if not sender_email or not sender_password:
-            logger.error("Email credentials not found in environment variables")
-            return False
+        results = send_alert_digests([{
+            "user_email": user_email,
+            "product_title": product_title,
+            "current_price": current_price,
+            "target_price": target_price,
+            "product_url": product_url,
+        }])
+        return results.get(user_email, False)
         
-        # Create message
-        msg = MIMEMultipart()
-        msg["From"] = sender_email
-        msg["To"] = user_email
-        msg["Subject"] = f"Price Alert: {product_title} is now ${current_price:.2f}!"
-        
-        # Create email body
+    except Exception as e:
+        logger.error(f"Failed to send price alert email: {str(e)}")
+        return False
+
+EMAIL_SMTP_HOST = os.getenv("EMAIL_SMTP_HOST", "smtp.gmail.com")
+EMAIL_SMTP_PORT = int(os.getenv("EMAIL_SMTP_PORT", "587"))
+EMAIL_SMTP_CONNECTIONS = int(os.getenv("EMAIL_SMTP_CONNECTIONS", "2"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+EMAIL_MAX_RETRIES = int(os.getenv("EMAIL_MAX_RETRIES", "3"))
+EMAIL_RETRY_BACKOFF = float(os.getenv("EMAIL_RETRY_BACKOFF", "1.0"))
+EMAIL_SEND_TIMEOUT = float(os.getenv("EMAIL_SEND_TIMEOUT", "120"))
+
+SEND_SECONDS = metrics.histogram(
+    "price_tracker_email_send_seconds",
+    "Time to deliver one alert email, including reconnects and retries",
+    ("outcome",)
+)
+SEND_RETRIES = metrics.counter("price_tracker_email_retries_total", "Email send attempts that were retried")
+
+class EmailConfigError(Exception):
+    """Raised when the email credentials are missing from the environment."""
+
+def check_email_settings():
+    """
+    Check that alert emails can be sent; searches and alerts work without them.
+
+    Raises:
+        EmailConfigError: EMAIL_ADDRESS or EMAIL_PASSWORD is not set
+    """
+    missing = [name for name in ("EMAIL_ADDRESS", "EMAIL_PASSWORD") if not os.getenv(name)]
+    if missing:
+        raise EmailConfigError(f"Email credentials not found in environment variables: {', '.join(missing)}")
+
+def build_alert_message(sender_email: str, user_email: str, alerts: List[dict]) -> MIMEMultipart:
+    """
+    Build one email for all of a user's triggered alerts.
+
+    Args:
+        sender_email (str): From address
+        user_email (str): Recipient's email address
+        alerts (List[dict]): Alerts with product_title, current_price, target_price and product_url
+
+    Returns:
+        MIMEMultipart: A single alert email, or a digest when several alerts fired
+    """
+    msg = MIMEMultipart()
+    msg["From"] = sender_email
+    msg["To"] = user_email
+
+    if len(alerts) == 1:
+        alert = alerts[0]
+        msg["Subject"] = f"Price Alert: {alert['product_title']} is now ${alert['current_price']:.2f}!"
         body = f"""
-        Good news! The price for {product_title} has dropped below your target price.
+        Good news! The price for {alert['product_title']} has dropped below your target price.
         
-        Current Price: ${current_price:.2f}
-        Your Target Price: ${target_price:.2f}
+        Current Price: ${alert['current_price']:.2f}
+        Your Target Price: ${alert['target_price']:.2f}
         
         You can view the product here:
-        {product_url}
+        {alert['product_url']}
         
         Happy shopping!
         
         Best regards,
         Your Price Tracker
         """
+    else:
+        msg["Subject"] = f"Price Alert: {len(alerts)} of your tracked products dropped in price!"
+        items = "\n".join(
+            f"""
+        {alert['product_title']}
+        Current Price: ${alert['current_price']:.2f} (your target: ${alert['target_price']:.2f})
+        {alert['product_url']}
+        """
+            for alert in alerts
+        )
+        body = f"""
+        Good news! Several products you are tracking have dropped below your target price.
+        {items}
+        Happy shopping!
         
-        msg.attach(MIMEText(body, "plain"))
-        
-        # Create SMTP session
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
-            
-        logger.info(f"Price alert email sent successfully to {user_email}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Failed to send price alert email: {str(e)}")
-        return False 
\ No newline at end of file
+        Best regards,
+        Your Price Tracker
+        """
+
+    msg.attach(MIMEText(body, "plain"))
+    return msg
+
+class EmailDispatcher:
+    """
+    Asynchronous email sender with persistent SMTP connections.
+
+    Messages are queued from any thread and sent by `connections` worker
+    coroutines on a private event loop. Each worker keeps its connection
+    open between messages, reconnects when the server drops it, and retries
+    failed sends with exponential backoff.
+    """
+
+    def __init__(self, sender_email: str, password: Optional[str] = None,
+                 hostname: str = EMAIL_SMTP_HOST, port: int = EMAIL_SMTP_PORT,
+                 connections: int = EMAIL_SMTP_CONNECTIONS, batch_size: int = EMAIL_BATCH_SIZE,
+                 max_retries: int = EMAIL_MAX_RETRIES, retry_backoff: float = EMAIL_RETRY_BACKOFF):
+        self.sender_email = sender_email
+        self.password = password
+        self.hostname = hostname
+        self.port = port
+        self.connections = connections
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._loop = None
+        self._queue = None
+        self._thread = None
+        self._workers = []
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._sent = 0
+        self._failed = 0
+        self._retries = 0
+        self._connects = 0
+        self._send_seconds = 0.0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread:
+                return
+            started = threading.Event()
+
+            def run():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                self._queue = asyncio.Queue()
+                self._workers = [self._loop.create_task(self._worker()) for _ in range(self.connections)]
+                started.set()
+                self._loop.run_forever()
+                self._loop.close()
+
+            self._thread = threading.Thread(target=run, name="email-dispatcher", daemon=True)
+            self._thread.start()
+            started.wait()
+
+    def stop(self, timeout: float = 10):
+        """Close every SMTP connection and stop the event loop; unsent messages resolve to False."""
+        with self._start_lock:
+            if not self._thread:
+                return
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+            self._thread.join(timeout)
+            self._thread = None
+
+    async def _shutdown(self):
+        for worker in self._workers:
+            worker.cancel()
+        # Each worker closes its own connection as it is cancelled
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.set_result(False)
+        self._loop.stop()
+
+    def submit(self, message) -> Future:
+        """Queue a message from any thread; the returned future resolves to True once sent."""
+        self.start()
+        future = Future()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (message, future))
+        return future
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(hostname=self.hostname, port=self.port)
+        await smtp.connect()
+        if self.password:
+            await smtp.login(self.sender_email, self.password)
+        with self._stats_lock:
+            self._connects += 1
+        return smtp
+
+    async def _worker(self):
+        smtp = None
+        batch = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+                for message, future in batch:
+                    started = time.monotonic()
+                    sent = False
+                    for attempt in range(self.max_retries + 1):
+                        try:
+                            if smtp is None or not smtp.is_connected:
+                                smtp = await self._connect()
+                            await smtp.send_message(message)
+                            sent = True
+                            break
+                        except Exception as e:
+                            logger.warning(f"Email send attempt {attempt + 1} to {message['To']} failed: {str(e)}")
+                            if smtp is not None:
+                                smtp.close()
+                                smtp = None
+                            if attempt < self.max_retries:
+                                with self._stats_lock:
+                                    self._retries += 1
+                                SEND_RETRIES.inc()
+                                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+
+                    elapsed = time.monotonic() - started
+                    SEND_SECONDS.observe(elapsed, outcome="sent" if sent else "failed")
+                    with self._stats_lock:
+                        self._send_seconds += elapsed
+                        if sent:
+                            self._sent += 1
+                        else:
+                            self._failed += 1
+                    if not sent:
+                        logger.error(f"Giving up on email to {message['To']} after {self.max_retries + 1} attempts")
+                    future.set_result(sent)
+        finally:
+            # Reached when stop() cancels the worker
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(False)
+            if smtp is not None:
+                try:
+                    await asyncio.wait_for(smtp.quit(), timeout=5)
+                except Exception:
+                    smtp.close()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            attempts = self._sent + self._failed
+            return {
+                "sent": self._sent,
+                "failed": self._failed,
+                "retries": self._retries,
+                "connects": self._connects,
+                "queued": self._queue.qsize() if self._queue else 0,
+                "avg_send_seconds": self._send_seconds / attempts if attempts else 0.0,
+            }
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def get_dispatcher() -> Optional[EmailDispatcher]:
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            try:
+                check_email_settings()
+            except EmailConfigError as e:
+                logger.error(str(e))
+                return None
+            _dispatcher = EmailDispatcher(os.getenv("EMAIL_ADDRESS"), os.getenv("EMAIL_PASSWORD"))
+        return _dispatcher
+
+def close_dispatcher():
+    """Stop the shared dispatcher, if one was started, closing its SMTP connections."""
+    with _dispatcher_lock:
+        if _dispatcher is not None:
+            _dispatcher.stop()
+
+def send_alert_digests(notifications: List[dict], timeout: float = EMAIL_SEND_TIMEOUT) -> Dict[str, bool]:
+    """
+    Send one email per user covering all of their triggered alerts.
+
+    Args:
+        notifications (List[dict]): Triggered alerts with user_email, product_title,
+            current_price, target_price and product_url
+        timeout (float): Seconds to wait for the queue to drain
+
+    Returns:
+        Dict[str, bool]: Whether the email to each user was sent
+    """
+    by_user = defaultdict(list)
+    for notification in notifications:
+        by_user[notification["user_email"]].append(notification)
+    if not by_user:
+        return {}
+
+    dispatcher = get_dispatcher()
+    if dispatcher is None:
+        return {user_email: False for user_email in by_user}
+
+    futures = {
+        user_email: dispatcher.submit(build_alert_message(dispatcher.sender_email, user_email, alerts))
+        for user_email, alerts in by_user.items()
+    }
+    deadline = time.monotonic() + timeout
+    results = {}
+    for user_email, future in futures.items():
+        try:
+            results[user_email] = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FuturesTimeoutError:
+            logger.error(f"Timed out waiting for price alert email to {user_email}")
+            results[user_email] = False
+    logger.info(f"Sent {sum(results.values())} of {len(results)} price alert emails")
+    return results
@@ -0,0 +1,300 @@
+"""
+Fast scraping tier: plain HTTP fetch + static HTML parsing.
+
+Search pages are fetched with a pooled `requests` session and the selector
+lists from retailers.py are applied with BeautifulSoup. Callers fall back to
+the Selenium scrapers when this tier returns nothing or hits a bot wall.
+"""
+import os
+import re
+import threading
+import time
+import logging
+from collections import defaultdict
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+from price_parsing import extract_price
+from rate_limit import STATIC, rate_limiter
+from retailers import RETAILERS, build_search_url, find_block_marker
+
+logger = logging.getLogger(__name__)
+
+HTTP_FETCH_TIMEOUT = float(os.getenv("HTTP_FETCH_TIMEOUT", "10"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+}
+
+BLOCKED_STATUS_CODES = {403, 429, 503}
+
+# Shared with the browser engine (scrape_engine.py / page_extract.py)
+SCRAPE_STAGE_SECONDS = metrics.histogram(
+    "price_tracker_scrape_stage_seconds",
+    "Time spent in each scraping stage (acquire, navigate, wait, scroll, extract, fetch, parse)",
+    ("retailer", "tier", "stage")
+)
+SELECTOR_HITS = metrics.counter(
+    "price_tracker_selector_hits_total",
+    "Which selector in each retailer selector list matched, per product card",
+    ("retailer", "tier", "field", "selector")
+)
+
+for _spec in RETAILERS.values():
+    rate_limiter.configure(_spec["domain"], _spec["requests_per_minute"])
+
+
+class BotWallError(Exception):
+    """Raised when a retailer answers with a CAPTCHA or block page."""
+
+
+class DeadlineExceeded(Exception):
+    """Raised between scrape steps once the caller's deadline has passed."""
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    """
+    Seconds until a time.monotonic() deadline, checked between scrape steps.
+
+    Callers that stop waiting for a scrape (asyncio.wait_for) cannot stop its
+    thread, so the scrape itself gives up, releasing its browser and
+    executor slot, once its deadline passes.
+
+    Returns:
+        Optional[float]: Seconds left, or None when there is no deadline
+
+    Raises:
+        DeadlineExceeded: The deadline has passed
+    """
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("Scrape deadline passed")
+    return left
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.3, status_forcelist=[500, 502, 504])
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+# Shared keep-alive session; connections are reused across searches
+http_session = _build_session()
+
+
+def fetch_html(url: str, spec: dict, timeout: float = HTTP_FETCH_TIMEOUT) -> str:
+    # A paused domain raises RateLimitTimeout, sending the caller to the browser tier
+    rate_limiter.acquire(spec["domain"], STATIC, timeout=timeout)
+    response = http_session.get(url, timeout=timeout)
+    if response.status_code in BLOCKED_STATUS_CODES:
+        rate_limiter.report_blocked(spec["domain"], STATIC)
+        raise BotWallError(f"{spec['name']} returned HTTP {response.status_code}")
+    response.raise_for_status()
+    html = response.text
+    marker = find_block_marker(html, spec)
+    if marker:
+        rate_limiter.report_blocked(spec["domain"], STATIC)
+        raise BotWallError(f"{spec['name']} served a bot wall ({marker})")
+    rate_limiter.report_success(spec["domain"], STATIC)
+    return html
+
+
+def _first_text(node, selectors: List[str]) -> Tuple[str, Optional[str]]:
+    """Return the first non-empty text and the selector that produced it."""
+    for selector in selectors:
+        element = node.select_one(selector)
+        if element:
+            text = element.get_text(" ", strip=True)
+            if text:
+                return text, selector
+    return "", None
+
+
+def _select_text(node, selectors: List[str]) -> str:
+    return _first_text(node, selectors)[0]
+
+
+def _first_attribute(node, selectors: List[str], attribute: str) -> Tuple[str, Optional[str]]:
+    for selector in selectors:
+        element = node.select_one(selector)
+        if element and element.get(attribute):
+            return element.get(attribute), selector
+    return "", None
+
+
+def _parse_rating(node, spec: dict):
+    rating = None
+    reviews_count = None
+    if not spec.get("rating_selector"):
+        return rating, reviews_count
+
+    element = node.select_one(spec["rating_selector"])
+    if element:
+        if spec.get("rating_attribute"):
+            rating_text = element.get(spec["rating_attribute"]) or ""
+        else:
+            rating_text = element.get_text(" ", strip=True)
+        rating_match = re.search(r'(\d+(\.\d+)?)', rating_text)
+        if rating_match:
+            rating = float(rating_match.group(1))
+        reviews_match = re.search(r'(\d+)\s+reviews?', rating_text)
+        if reviews_match:
+            reviews_count = int(reviews_match.group(1))
+
+    if spec.get("reviews_selector"):
+        reviews_text = _select_text(node, [spec["reviews_selector"]])
+        try:
+            reviews_count = int(reviews_text.replace(",", ""))
+        except ValueError:
+            pass
+    return rating, reviews_count
+
+
+def parse_search_results(html: str, spec: dict) -> List[dict]:
+    """Apply a retailer's selector lists to a search page and return product dicts."""
+    # Imported on first parse: bs4 is slow to import and the API may never need it
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    def hit(field, selector):
+        SELECTOR_HITS.inc(retailer=spec["name"], tier="static", field=field, selector=selector)
+
+    products = []
+    for selector in spec["product_selectors"]:
+        products = soup.select(selector)
+        if products:
+            hit("product", selector)
+            break
+
+    items = []
+    for product in products[:spec["max_products"]]:
+        title, title_selector = _first_text(product, spec["title_selectors"])
+        if not title:
+            continue
+
+        price = 0.0
+        for price_selector in spec["price_selectors"]:
+            price = extract_price(_select_text(product, [price_selector]))
+            if price > 0:
+                break
+        if price == 0:
+            continue
+
+        url, url_selector = _first_attribute(product, spec["url_selectors"], "href")
+        if not url:
+            continue
+        url = urljoin(spec["base_url"], url)
+
+        image_url, image_selector = _first_attribute(product, spec["image_selectors"], "src")
+        rating, reviews_count = _parse_rating(product, spec)
+
+        hit("title", title_selector)
+        hit("price", price_selector)
+        hit("url", url_selector)
+        if image_selector:
+            hit("image", image_selector)
+
+        items.append({
+            "title": title,
+            "price": price,
+            "url": url,
+            "image_url": image_url or None,
+            "rating": rating,
+            "reviews_count": reviews_count,
+        })
+    return items
+
+
+def scrape_static(spec: dict, query: str, deadline: Optional[float] = None) -> List[dict]:
+    url = build_search_url(spec, query)
+    logger.info(f"Fetching {spec['name']} over HTTP: {url}")
+    left = time_left(deadline)
+    timeout = HTTP_FETCH_TIMEOUT if left is None else min(HTTP_FETCH_TIMEOUT, left)
+    with SCRAPE_STAGE_SECONDS.time(retailer=spec["name"], tier="static", stage="fetch"):
+        html = fetch_html(url, spec, timeout)
+    with SCRAPE_STAGE_SECONDS.time(retailer=spec["name"], tier="static", stage="parse"):
+        return parse_search_results(html, spec)
+
+
+class TierStats:
+    """Per-retailer counters for the static and browser scraping tiers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {
+            "static_attempts": 0,
+            "static_hits": 0,
+            "bot_walls": 0,
+            "fallbacks": 0,
+            "static_seconds": 0.0,
+            "browser_attempts": 0,
+            "browser_seconds": 0.0,
+        })
+
+    def record(self, source: str, tier: str, elapsed: float, hit: bool = False,
+               bot_wall: bool = False):
+        with self._lock:
+            stats = self._stats[source]
+            stats[f"{tier}_attempts"] += 1
+            stats[f"{tier}_seconds"] += elapsed
+            if tier == "static":
+                if hit:
+                    stats["static_hits"] += 1
+                else:
+                    stats["fallbacks"] += 1
+                if bot_wall:
+                    stats["bot_walls"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            report = {}
+            for source, stats in self._stats.items():
+                static_attempts = stats["static_attempts"]
+                browser_attempts = stats["browser_attempts"]
+                report[source] = {
+                    **stats,
+                    "fallback_rate": stats["fallbacks"] / static_attempts if static_attempts else 0.0,
+                    "static_avg_seconds": stats["static_seconds"] / static_attempts if static_attempts else 0.0,
+                    "browser_avg_seconds": stats["browser_seconds"] / browser_attempts if browser_attempts else 0.0,
+                }
+            return report
+
+
+tier_stats = TierStats()
+
+
+def try_static(spec: dict, query: str, deadline: Optional[float] = None) -> Optional[List[dict]]:
+    """Run the static tier, recording its outcome; returns None when the caller should fall back."""
+    started = time.monotonic()
+    try:
+        items = scrape_static(spec, query, deadline)
+    except BotWallError as e:
+        logger.warning(f"Static fetch blocked, falling back to browser: {str(e)}")
+        tier_stats.record(spec["name"], "static", time.monotonic() - started, bot_wall=True)
+        return None
+    except Exception as e:
+        logger.warning(f"Static fetch failed for {spec['name']}, falling back to browser: {str(e)}")
+        tier_stats.record(spec["name"], "static", time.monotonic() - started)
+        return None
+
+    tier_stats.record(spec["name"], "static", time.monotonic() - started, hit=bool(items))
+    if not items:
+        logger.info(f"Static parse found no {spec['name']} products, falling back to browser")
+        return None
+    logger.info(f"Static parse found {len(items)} {spec['name']} products")
+    return items
@@ -0,0 +1,30 @@
+"""
+JSON serialization with orjson.
+
+FastJSONResponse is the app's default response class. Endpoints that
+return large payloads (searches, search jobs, alert pages) build it
+directly from their data, which skips FastAPI's jsonable_encoder pass:
+orjson writes datetimes itself and Pydantic models are dumped to dicts on
+the way. Non-finite floats, such as the infinite current price of an
+unchecked alert, are written as null.
+"""
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+
+def _default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
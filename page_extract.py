@@ -0,0 +1,152 @@
+"""
+Single-pass in-browser extraction.
+
+Instead of one WebDriver round trip per selector per product card, the
+retailer spec is sent to the page once and EXTRACT_SCRIPT evaluates every
+card's selectors in the browser, returning all raw fields as one JSON
+payload. Price and rating text are then parsed in Python, each distinct
+price string on the page once.
+"""
+import re
+import logging
+from typing import List
+
+from http_scraper import SELECTOR_HITS
+from price_parsing import current_price, parse_prices
+
+logger = logging.getLogger(__name__)
+
+EXTRACT_SCRIPT = """
+const spec = arguments[0];
+const textOf = (el) => el ? (el.innerText || el.textContent || '').trim() : '';
+// Each lookup returns [value, index of the selector that matched or -1]
+const firstText = (root, selectors) => {
+    for (let i = 0; i < selectors.length; i++) {
+        const text = textOf(root.querySelector(selectors[i]));
+        if (text) return [text, i];
+    }
+    return ['', -1];
+};
+const firstAttr = (root, selectors, name) => {
+    for (let i = 0; i < selectors.length; i++) {
+        const el = root.querySelector(selectors[i]);
+        if (!el) continue;
+        // Read resolved properties for links and images, like WebElement.get_attribute
+        const value = name in el && typeof el[name] === 'string' ? el[name] : el.getAttribute(name);
+        if (value) return [value, i];
+    }
+    return ['', -1];
+};
+
+let cards = [];
+let matched = null;
+for (const selector of spec.product_selectors) {
+    cards = document.querySelectorAll(selector);
+    if (cards.length) { matched = selector; break; }
+}
+
+const items = Array.from(cards).slice(0, spec.max_products).map(card => {
+    const ratingEl = spec.rating_selector ? card.querySelector(spec.rating_selector) : null;
+    const [title, titleIndex] = firstText(card, spec.title_selectors);
+    const [url, urlIndex] = firstAttr(card, spec.url_selectors, 'href');
+    const [imageUrl, imageIndex] = firstAttr(card, spec.image_selectors, 'src');
+    return {
+        title: title,
+        price_texts: spec.price_selectors.map(selector => textOf(card.querySelector(selector))),
+        url: url,
+        image_url: imageUrl,
+        rating_text: ratingEl
+            ? (spec.rating_attribute ? (ratingEl.getAttribute(spec.rating_attribute) || '') : textOf(ratingEl))
+            : '',
+        reviews_text: spec.reviews_selector ? firstText(card, [spec.reviews_selector])[0] : '',
+        selector_indexes: {title: titleIndex, url: urlIndex, image: imageIndex}
+    };
+});
+return {matched: matched, total: cards.length, items: items};
+"""
+
+# Only the spec fields the script reads are sent to the browser
+SCRIPT_FIELDS = (
+    "product_selectors", "max_products", "title_selectors", "price_selectors",
+    "url_selectors", "image_selectors", "rating_selector", "rating_attribute",
+    "reviews_selector",
+)
+
+_RATING = re.compile(r'(\d+(\.\d+)?)')
+_REVIEWS = re.compile(r'(\d+)\s+reviews?')
+
+
+def build_item(raw: dict, prices: dict) -> dict:
+    """Turn one card's raw payload into a product dict, or None when it lacks a title, price or URL."""
+    title = raw.get("title")
+    if not title:
+        return None
+
+    price = 0.0
+    for price_text in raw.get("price_texts", []):
+        price = prices.get(price_text, 0.0)
+        if price > 0:
+            break
+    if price == 0:
+        return None
+
+    url = raw.get("url")
+    if not url or not url.startswith("http"):
+        return None
+
+    rating = None
+    reviews_count = None
+    rating_text = raw.get("rating_text") or ""
+    rating_match = _RATING.search(rating_text)
+    if rating_match:
+        rating = float(rating_match.group(1))
+    reviews_match = _REVIEWS.search(rating_text)
+    if reviews_match:
+        reviews_count = int(reviews_match.group(1))
+    reviews_text = (raw.get("reviews_text") or "").replace(",", "")
+    if reviews_text.isdigit():
+        reviews_count = int(reviews_text)
+
+    return {
+        "title": title,
+        "price": price,
+        "url": url,
+        "image_url": raw.get("image_url") or None,
+        "rating": rating,
+        "reviews_count": reviews_count,
+    }
+
+
+def extract_products(driver, spec: dict) -> List[dict]:
+    """Extract every product card on the current page with a single execute_script call."""
+    payload = driver.execute_script(EXTRACT_SCRIPT, {field: spec[field] for field in SCRIPT_FIELDS})
+    if not payload or not payload.get("matched"):
+        logger.warning(f"No {spec['name']} products found with any selector")
+        return []
+
+    logger.info(f"Found {payload['total']} {spec['name']} products with selector: {payload['matched']}")
+
+    def hit(field, selector):
+        SELECTOR_HITS.inc(retailer=spec["name"], tier="browser", field=field, selector=selector)
+
+    hit("product", payload["matched"])
+
+    # Cards repeat price strings; parse each distinct one once
+    texts = list({text for raw in payload["items"] for text in raw["price_texts"] if text})
+    prices = {}
+    for text, records in zip(texts, parse_prices(texts)):
+        record = current_price(records)
+        if record:
+            prices[text] = record.amount
+
+    items = []
+    for raw in payload["items"]:
+        item = build_item(raw, prices)
+        if item:
+            items.append(item)
+            price_index = next(i for i, text in enumerate(raw["price_texts"]) if prices.get(text, 0.0) > 0)
+            hit("price", spec["price_selectors"][price_index])
+            for field, index in raw["selector_indexes"].items():
+                if index >= 0:
+                    hit(field, spec[f"{field}_selectors"][index])
+    return items
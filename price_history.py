@@ -0,0 +1,195 @@
+"""
+Price history store and downsampled reads.
+
+Observations are deduplicated on write: when a product's price matches its
+latest stored row, that row's last_seen_at is bumped instead of inserting a
+new one. Each row therefore stands for the price from observed_at until the
+next row (or its own last_seen_at for the newest row). Times are stored as
+naive UTC, and aware times passed in are converted to match.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func
+
+from models import PriceObservation
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+
+def to_naive_utc(moment: datetime) -> datetime:
+    """Convert an aware datetime to the naive UTC the database stores; naive ones are assumed to be UTC already."""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def record_observations(db, observations: Iterable[Tuple[str, str, float]],
+                        observed_at: Optional[datetime] = None):
+    """
+    Append (product_id, source, price) observations, collapsing unchanged prices.
+
+    Args:
+        db: SQLAlchemy session; the caller commits
+        observations: (product_id, source, price) tuples
+        observed_at (datetime): Observation time, defaults to now (UTC)
+    """
+    observed_at = observed_at or datetime.utcnow()
+    latest_by_product = {}
+    for product_id, source, price in observations:
+        latest_by_product[product_id] = (source, price)
+    if not latest_by_product:
+        return
+
+    # Latest stored row for every product in one query
+    newest = (
+        db.query(PriceObservation.product_id, func.max(PriceObservation.observed_at).label("observed_at"))
+        .filter(PriceObservation.product_id.in_(list(latest_by_product)))
+        .group_by(PriceObservation.product_id)
+        .subquery()
+    )
+    rows = (
+        db.query(PriceObservation)
+        .join(newest, (PriceObservation.product_id == newest.c.product_id)
+              & (PriceObservation.observed_at == newest.c.observed_at))
+        .all()
+    )
+    latest_rows = {row.product_id: row for row in rows}
+
+    for product_id, (source, price) in latest_by_product.items():
+        row = latest_rows.get(product_id)
+        if row and row.price == price:
+            row.last_seen_at = observed_at
+        else:
+            db.add(PriceObservation(
+                product_id=product_id,
+                source=source,
+                price=price,
+                observed_at=observed_at,
+                last_seen_at=observed_at
+            ))
+
+
+def price_activity(db, product_ids: Iterable[str], since: datetime) -> Dict[str, Tuple[int, datetime]]:
+    """
+    How often and how recently each product's price changed.
+
+    Args:
+        db: SQLAlchemy session
+        product_ids: Products to look up, in one query
+        since (datetime): Start of the window in which changes are counted
+
+    Returns:
+        Dict[str, Tuple[int, datetime]]: (price changes since `since`, time of
+            the latest change or first observation) per product with history
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+    rows = (
+        db.query(
+            PriceObservation.product_id,
+            func.count(case((PriceObservation.observed_at >= since, 1))),
+            func.min(PriceObservation.observed_at),
+            func.max(PriceObservation.observed_at),
+        )
+        .filter(PriceObservation.product_id.in_(product_ids))
+        .group_by(PriceObservation.product_id)
+        .all()
+    )
+    # Every row after a product's first one starts a new price
+    return {
+        product_id: (in_window - (1 if first_seen >= since else 0), last_change)
+        for product_id, in_window, first_seen, last_change in rows
+    }
+
+
+def _bucket_start(moment: datetime, resolution: str) -> datetime:
+    if resolution == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def get_history(db, product_id: str, start: datetime, end: datetime,
+                resolution: str = "day") -> List[dict]:
+    """
+    Return the price series for a product between start and end.
+
+    With resolution "raw" every stored row in range is returned. With "hour"
+    or "day" one {t, min, max, last} point is returned per bucket covered by
+    known prices, so a 90-day daily chart has about 90 points.
+    """
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    # Rows in range plus the row in effect at `start`
+    previous = (
+        db.query(PriceObservation)
+        .filter(PriceObservation.product_id == product_id, PriceObservation.observed_at < start)
+        .order_by(PriceObservation.observed_at.desc())
+        .first()
+    )
+    rows = (
+        db.query(PriceObservation)
+        .filter(
+            PriceObservation.product_id == product_id,
+            PriceObservation.observed_at >= start,
+            PriceObservation.observed_at <= end
+        )
+        .order_by(PriceObservation.observed_at)
+        .all()
+    )
+    if previous:
+        rows.insert(0, previous)
+
+    if resolution == "raw":
+        return [
+            {
+                "t": row.observed_at.isoformat(),
+                "last_seen": row.last_seen_at.isoformat(),
+                "price": row.price,
+            }
+            for row in rows
+            if row.last_seen_at >= start
+        ]
+
+    step = RESOLUTIONS[resolution]
+
+    # Each row holds its price until the next row starts
+    segments = []
+    for index, row in enumerate(rows):
+        seg_end = rows[index + 1].observed_at if index + 1 < len(rows) else row.last_seen_at
+        seg_start = max(row.observed_at, start)
+        seg_end = min(seg_end, end)
+        if seg_end >= seg_start:
+            segments.append((seg_start, seg_end, row.price))
+    if not segments:
+        return []
+
+    points = []
+    cursor = 0
+    bucket = _bucket_start(segments[0][0], resolution)
+    last_moment = segments[-1][1]
+    while bucket <= last_moment:
+        bucket_end = bucket + step
+        # Skip segments that ended before this bucket
+        while cursor < len(segments) and segments[cursor][1] < bucket:
+            cursor += 1
+        prices = []
+        index = cursor
+        while index < len(segments) and segments[index][0] < bucket_end:
+            prices.append(segments[index][2])
+            index += 1
+        if prices:
+            points.append({
+                "t": bucket.isoformat(),
+                "min": min(prices),
+                "max": max(prices),
+                "last": prices[-1],
+            })
+        bucket = bucket_end
+    return points
@@ -0,0 +1,228 @@
+"""
+Price string parsing.
+
+Every amount in a string becomes a PriceRecord(amount, currency, kind).
+Currency symbols/codes, thousands separators (1,299.99 and 1.299,99),
+ranges ("$10 – $20"), was/now pairs ("Was $15.99 Now $12.99") and unit
+prices ("$0.22/oz") are recognised explicitly with precompiled patterns.
+Most strings on a results page are a lone dollar price ("$19.99"), which a
+single fullmatch recognises without the general scan, and strings with no
+label, range or unit marker skip classification. Even so, parsing is several
+times slower per string than the single regex it replaced; accuracy is the
+trade (benchmarks/price_parsing_speed.py).
+`parse_prices` parses a list of strings, such as a page's price texts, and
+`extract_price` keeps the old float-or-0.0 contract for existing callers.
+"""
+import re
+import logging
+from typing import Iterable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CURRENCY = "USD"
+
+# Record kinds
+CURRENT = "current"
+WAS = "was"
+RANGE_LOW = "range_low"
+RANGE_HIGH = "range_high"
+UNIT = "unit"
+
+CURRENCY_SYMBOLS = {
+    "$": "USD", "US$": "USD", "CA$": "CAD", "C$": "CAD", "A$": "AUD",
+    "€": "EUR", "£": "GBP", "¥": "JPY",
+    "USD": "USD", "CAD": "CAD", "AUD": "AUD", "EUR": "EUR", "GBP": "GBP",
+}
+
+# Currencies whose prices are usually written 1.299,99
+COMMA_DECIMAL_CURRENCIES = {"EUR"}
+
+# The leading lookahead lets the scanner skip characters that cannot start a price;
+# the trailing one keeps percentages ("20%", "12.5 %") from matching, even in part
+_AMOUNT = re.compile(
+    r"(?=[\d$€£¥UCAEG])(?:(?P<prefix>US\$|CA\$|C\$|A\$|USD|CAD|AUD|EUR|GBP|[$€£¥])[ \t\u00a0]*)?"
+    r"(?P<number>\d{1,3}(?:[,.\u00a0\u202f]\d{3})+(?:[.,]\d{1,2})?|\d+(?:[.,]\d{1,2})?)(?![\d%]|[.,]\d|[ \t\u00a0]+%)"
+    r"(?:[ \t\u00a0]*(?P<suffix>USD|CAD|AUD|EUR|GBP|[€£]))?"
+)
+# A string that is nothing but one dollar amount; anything else takes the general path
+_PLAIN_PRICE = re.compile(r"(?:US\$|\$)?[ \u00a0]?(\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)")
+# Rendered prices are often split over lines ("$\n284\n.\n78")
+_LINE_BREAK_IN_NUMBER = re.compile(r"(?<=[$€£])\s*\n\s*(?=\d)|(?<=\d)\s*\n\s*(?=[.,]\s*\d)|(?<=[.,])\s*\n\s*(?=\d)")
+# Classifiers applied to the text between and after amounts
+_WAS_LABEL = re.compile(r"\b(?:was|reg(?:ular)?|list(?:\s+price)?|msrp|original(?:ly)?|compare(?:\s+at)?|typical)\b", re.I)
+_RANGE_GAP = re.compile(r"\s*(?:-|–|—|to)\s*", re.I)
+_UNIT_SUFFIX = re.compile(r"\s*(?:/\s*|per\s+)(?!ea\b|each\b)[a-z]", re.I)
+# Everything the classifiers above look for; a string containing none of it holds only current prices.
+# Substring checks on the lowered string are several times faster than one more regex scan
+_CONTEXT_MARKERS = ("-", "–", "—", "/", "to", "per", "was", "reg", "list", "msrp", "original", "compare", "typical")
+
+
+class PriceRecord(NamedTuple):
+    amount: float
+    currency: str
+    kind: str
+
+
+def _to_amount(number: str, currency: str) -> float:
+    if number.replace(".", "", 1).isdigit():
+        # Plain 12 / 12.99; 1.299 is only grouped thousands in comma-decimal currencies
+        if currency not in COMMA_DECIMAL_CURRENCIES or len(number) - number.find(".") != 4:
+            return float(number)
+
+    # Spaces only ever group thousands
+    number = number.replace("\u00a0", "").replace("\u202f", "")
+    last_dot = number.rfind(".")
+    last_comma = number.rfind(",")
+    if last_dot >= 0 and last_comma >= 0:
+        decimal = "." if last_dot > last_comma else ","
+    elif last_dot >= 0 or last_comma >= 0:
+        separator = "." if last_dot >= 0 else ","
+        groups = number.split(separator)
+        if len(groups) > 2:
+            decimal = None
+        elif len(groups[1]) == 3:
+            # 1,299 is always thousands; 1.299 only for comma-decimal currencies
+            decimal = "." if separator == "." and currency not in COMMA_DECIMAL_CURRENCIES else None
+        else:
+            decimal = separator
+    else:
+        decimal = None
+
+    if decimal is None:
+        return float(number.replace(",", "").replace(".", ""))
+    integer, _, fraction = number.rpartition(decimal)
+    return float(f"{integer.replace(',', '').replace('.', '')}.{fraction}")
+
+
+def _is_marked(match) -> bool:
+    return bool(match.group("prefix") or match.group("suffix"))
+
+
+def _records(text: str, matches: list, start: int = 0, end: Optional[int] = None,
+             marked_only: bool = False) -> List[PriceRecord]:
+    """
+    Classify the amounts matched in text[start:end] using the text around them.
+
+    With `marked_only`, numbers without a currency symbol or code are dropped
+    ("2 for $5", "3 pack $9.99") unless they close a range ("$10 - 20").
+    """
+    end = len(text) if end is None else end
+    records = []
+    previous_end = start
+    previous_kind = None
+    last = len(matches) - 1
+    for index, match in enumerate(matches):
+        prefix, number, suffix = match.groups()
+        symbol = prefix or suffix
+        match_start, match_end = match.span()
+        if symbol:
+            currency = CURRENCY_SYMBOLS[symbol]
+        elif not marked_only:
+            currency = DEFAULT_CURRENCY
+        elif previous_kind in (CURRENT, RANGE_LOW) and _RANGE_GAP.fullmatch(text, previous_end, match_start):
+            currency = records[-1].currency
+        else:
+            # Labels before the dropped number belong to it, not to the next amount
+            previous_end, previous_kind = match_end, None
+            continue
+        following_start = matches[index + 1].start() if index < last else end
+
+        if match_end < following_start and _UNIT_SUFFIX.match(text, match_end, following_start):
+            kind = UNIT
+        elif previous_end < match_start and _WAS_LABEL.search(text, previous_end, match_start):
+            kind = WAS
+        elif previous_kind in (CURRENT, RANGE_LOW) and _RANGE_GAP.fullmatch(text, previous_end, match_start):
+            if previous_kind == CURRENT:
+                records[-1] = records[-1]._replace(kind=RANGE_LOW)
+            kind = RANGE_HIGH
+        else:
+            kind = CURRENT
+
+        records.append(PriceRecord(_to_amount(number, currency), currency, kind))
+        previous_end = match_end
+        previous_kind = kind
+    return records
+
+
+def _has_context(text: str) -> bool:
+    lowered = text.lower()
+    for marker in _CONTEXT_MARKERS:
+        if marker in lowered:
+            return True
+    return False
+
+
+def _parse(text: str) -> List[PriceRecord]:
+    if "\n" in text:
+        text = _LINE_BREAK_IN_NUMBER.sub("", text)
+    matches = list(_AMOUNT.finditer(text))
+    # Once any amount carries a currency, bare numbers are quantities, counts or sizes
+    marked = [match for match in matches if _is_marked(match)]
+    marked_only = 0 < len(marked) < len(matches)
+    if _has_context(text):
+        return _records(text, matches, marked_only=marked_only)
+    records = []
+    for match in marked if marked_only else matches:
+        prefix, number, suffix = match.groups()
+        symbol = prefix or suffix
+        currency = CURRENCY_SYMBOLS[symbol] if symbol else DEFAULT_CURRENCY
+        records.append(PriceRecord(_to_amount(number, currency), currency, CURRENT))
+    return records
+
+
+def parse_price_text(text: str) -> List[PriceRecord]:
+    """Return every price in `text`, in order, classified by kind."""
+    if not text:
+        return []
+    plain = _PLAIN_PRICE.fullmatch(text)
+    if plain:
+        return [PriceRecord(float(plain.group(1).replace(",", "")), DEFAULT_CURRENCY, CURRENT)]
+    return _parse(text)
+
+
+def parse_prices(texts: Iterable[str]) -> List[List[PriceRecord]]:
+    """
+    Parse a list of price strings, e.g. every card's price text on a results page.
+
+    Same results as calling parse_price_text on each string; repeated strings
+    are parsed once. Per distinct string it is no faster
+    (benchmarks/price_parsing_speed.py).
+
+    Args:
+        texts (Iterable[str]): Price strings, e.g. every card's price text on a results page
+
+    Returns:
+        List[List[PriceRecord]]: The records of each string, in input order
+    """
+    plain = _PLAIN_PRICE.fullmatch
+    parsed = {"": []}
+    results = []
+    for text in texts:
+        records = parsed.get(text)
+        if records is None:
+            if not text:
+                records = []
+            else:
+                match = plain(text)
+                if match:
+                    records = [PriceRecord(float(match.group(1).replace(",", "")), DEFAULT_CURRENCY, CURRENT)]
+                else:
+                    records = _parse(text)
+            parsed[text] = records
+        results.append(records)
+    return results
+
+
+def current_price(records: List[PriceRecord]) -> Optional[PriceRecord]:
+    """Pick the selling price: the first current price, else the low end of a range, else any non-unit price."""
+    for kinds in ((CURRENT,), (RANGE_LOW,), (WAS, RANGE_HIGH)):
+        for record in records:
+            if record.kind in kinds:
+                return record
+    return records[0] if records else None
+
+
+def extract_price(price_text: str) -> float:
+    """Return the selling price in `price_text`, or 0.0 when it holds no price."""
+    record = current_price(parse_price_text(price_text))
+    return record.amount if record else 0.0
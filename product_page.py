@@ -0,0 +1,195 @@
+"""
+Direct product-page price lookup used by alert checks.
+
+The product URL is fetched once and its price is read from embedded
+structured data (JSON-LD, then __NEXT_DATA__) before falling back to the
+retailer's DOM selectors. A browser is only used when the plain HTTP fetch
+is blocked or yields no price.
+"""
+import os
+import json
+import time
+import logging
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+from http_scraper import BotWallError, fetch_html, tier_stats
+from price_parsing import extract_price
+from rate_limit import BROWSER, rate_limiter
+from retailers import retailer_for_url, find_block_marker
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Longest an alert lookup waits for a browser request slot; a paused domain
+# fails the lookup, which the alert sweep retries later
+PRODUCT_PAGE_SLOT_TIMEOUT = float(os.getenv("PRODUCT_PAGE_SLOT_TIMEOUT", "30"))
+
+
+def _to_price(value) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        price = float(value)
+    else:
+        price = extract_price(str(value))
+    return price if price > 0 else None
+
+
+def _offer_price(offers) -> Optional[float]:
+    if isinstance(offers, list):
+        prices = [p for p in (_offer_price(offer) for offer in offers) if p]
+        return min(prices) if prices else None
+    if not isinstance(offers, dict):
+        return None
+    for key in ("price", "lowPrice"):
+        price = _to_price(offers.get(key))
+        if price:
+            return price
+    spec = offers.get("priceSpecification")
+    if isinstance(spec, dict):
+        return _to_price(spec.get("price"))
+    return None
+
+
+def _walk(node) -> Iterable[dict]:
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+
+
+def price_from_json_ld(soup: "BeautifulSoup") -> Optional[float]:
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        for node in _walk(data):
+            node_type = node.get("@type")
+            types = node_type if isinstance(node_type, list) else [node_type]
+            if "Product" in types and "offers" in node:
+                price = _offer_price(node["offers"])
+                if price:
+                    return price
+            elif "Offer" in types or "AggregateOffer" in types:
+                price = _offer_price(node)
+                if price:
+                    return price
+    return None
+
+
+def price_from_next_data(soup: "BeautifulSoup", paths: Iterable[str]) -> Optional[float]:
+    script = soup.find("script", id="__NEXT_DATA__")
+    if not script or not script.string:
+        return None
+    try:
+        data = json.loads(script.string)
+    except ValueError:
+        return None
+
+    for path in paths:
+        node = data
+        for part in path.split("."):
+            if isinstance(node, dict):
+                node = node.get(part)
+            elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+                node = node[int(part)]
+            else:
+                node = None
+                break
+        price = _to_price(node)
+        if price:
+            return price
+    return None
+
+
+def price_from_dom(soup: "BeautifulSoup", selectors: Iterable[str]) -> Optional[float]:
+    for selector in selectors:
+        element = soup.select_one(selector)
+        if not element:
+            continue
+        price = _to_price(element.get("content") or element.get_text(" ", strip=True))
+        if price:
+            return price
+    return None
+
+
+def extract_product_price(html: str, spec: dict) -> Optional[float]:
+    """Read the single product price from a product page, preferring structured data."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    return (
+        price_from_json_ld(soup)
+        or price_from_next_data(soup, spec["product_price_paths"])
+        or price_from_dom(soup, spec["product_price_selectors"])
+    )
+
+
+def _price_with_browser(url: str, spec: dict, lease_driver: Callable) -> Optional[float]:
+    # Selenium is imported on the first browser lookup, not when the API starts
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from scrape_engine import block_resources
+
+    # Slot first: a paused domain must not hold a leased browser while it waits
+    rate_limiter.acquire(spec["domain"], BROWSER, timeout=PRODUCT_PAGE_SLOT_TIMEOUT)
+    with lease_driver() as driver:
+        block_resources(driver, spec)
+        driver.get(url)
+        try:
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(spec["product_price_selectors"])))
+            )
+        except Exception:
+            logger.warning(f"Price element did not appear on {url}")
+        html = driver.page_source
+        if find_block_marker(html, spec):
+            rate_limiter.report_blocked(spec["domain"], BROWSER)
+            return None
+        rate_limiter.report_success(spec["domain"], BROWSER)
+        return extract_product_price(html, spec)
+
+
+def lookup_product_price(url: str, lease_driver: Callable) -> Optional[float]:
+    """
+    Return the current price shown on a product page.
+
+    Args:
+        url (str): Product page URL on a supported retailer
+        lease_driver (Callable): Context manager factory yielding a WebDriver, used as fallback
+
+    Returns:
+        Optional[float]: The price, or None for unsupported sites or pages without a price
+    """
+    spec = retailer_for_url(url)
+    if not spec:
+        logger.error(f"Unsupported website for product page: {url}")
+        return None
+    source = f"{spec['name']} product page"
+
+    started = time.monotonic()
+    try:
+        price = extract_product_price(fetch_html(url, spec), spec)
+        tier_stats.record(source, "static", time.monotonic() - started, hit=bool(price))
+        if price:
+            return price
+        logger.info(f"No price found in static {spec['name']} product page, falling back to browser")
+    except BotWallError as e:
+        logger.warning(f"Product page fetch blocked, falling back to browser: {str(e)}")
+        tier_stats.record(source, "static", time.monotonic() - started, bot_wall=True)
+    except Exception as e:
+        logger.warning(f"Product page fetch failed for {url}, falling back to browser: {str(e)}")
+        tier_stats.record(source, "static", time.monotonic() - started)
+
+    started = time.monotonic()
+    try:
+        return _price_with_browser(url, spec, lease_driver)
+    finally:
+        tier_stats.record(source, "browser", time.monotonic() - started)
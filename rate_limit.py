@@ -0,0 +1,134 @@
+"""
+Adaptive per-domain politeness scheduler shared by every scrape caller.
+
+Each retailer domain gets a token bucket per scraping tier (plain HTTP and
+browser). Callers block in `acquire` until the domain has a token, so
+concurrent searches and alert checks are spaced out together instead of
+each sleeping blindly. When a block page or CAPTCHA is reported the tier's
+rate is halved and a cooldown is applied; successful requests restore the
+rate gradually. Retailers turn away plain HTTP clients far sooner than real
+browsers, so a static-tier block never pauses the browser fallback.
+
+Browser callers take their slot before leasing a browser and pass the time
+left before their deadline, so a paused domain raises RateLimitTimeout
+instead of parking a leased browser in `acquire`.
+"""
+import os
+import threading
+import time
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_REQUESTS_PER_MINUTE = float(os.getenv("SCRAPE_REQUESTS_PER_MINUTE", "30"))
+SCRAPE_BURST = int(os.getenv("SCRAPE_BURST", "3"))
+SCRAPE_BLOCK_COOLDOWN = float(os.getenv("SCRAPE_BLOCK_COOLDOWN", "30"))
+SCRAPE_MAX_COOLDOWN = float(os.getenv("SCRAPE_MAX_COOLDOWN", "600"))
+
+STATIC = "static"
+BROWSER = "browser"
+TIERS = (STATIC, BROWSER)
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a domain does not free up a request slot in time."""
+
+
+class _Bucket:
+    def __init__(self, rate: float, burst: int):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.cooldown = 0.0
+        self.blocks = 0
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class DomainRateLimiter:
+    def __init__(self, requests_per_minute: float = SCRAPE_REQUESTS_PER_MINUTE,
+                 burst: int = SCRAPE_BURST, block_cooldown: float = SCRAPE_BLOCK_COOLDOWN,
+                 max_cooldown: float = SCRAPE_MAX_COOLDOWN):
+        self.default_rate = requests_per_minute / 60.0
+        self.default_burst = burst
+        self.block_cooldown = block_cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def configure(self, domain: str, requests_per_minute: float, burst: Optional[int] = None):
+        with self._lock:
+            for tier in TIERS:
+                self._buckets[domain, tier] = _Bucket(requests_per_minute / 60.0, burst or self.default_burst)
+
+    def _bucket(self, domain: str, tier: str) -> _Bucket:
+        bucket = self._buckets.get((domain, tier))
+        if bucket is None:
+            bucket = self._buckets[domain, tier] = _Bucket(self.default_rate, self.default_burst)
+        return bucket
+
+    def acquire(self, domain: str, tier: str, timeout: Optional[float] = None):
+        """
+        Block until `domain` may be requested again from `tier`.
+
+        Raises:
+            RateLimitTimeout: No slot frees up within `timeout` seconds; raised
+                at once when the wait is already known to be longer
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                bucket = self._bucket(domain, tier)
+                now = time.monotonic()
+                bucket.refill(now)
+                if now >= bucket.blocked_until and bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    return
+                wait = max(bucket.blocked_until - now, (1 - bucket.tokens) / bucket.rate)
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"No {tier} request slot for {domain} within {timeout:.0f}s")
+            time.sleep(wait)
+
+    def report_blocked(self, domain: str, tier: str):
+        """Back off after a block page: halve the tier's rate and pause it on the domain."""
+        with self._lock:
+            bucket = self._bucket(domain, tier)
+            bucket.blocks += 1
+            bucket.rate = max(bucket.base_rate / 16, bucket.rate / 2)
+            bucket.cooldown = min(self.max_cooldown, max(self.block_cooldown, bucket.cooldown * 2))
+            bucket.blocked_until = time.monotonic() + bucket.cooldown
+            bucket.tokens = 0
+            logger.warning(
+                f"Block detected on {domain} ({tier}); pausing {bucket.cooldown:.0f}s, "
+                f"rate now {bucket.rate * 60:.1f}/min"
+            )
+
+    def report_success(self, domain: str, tier: str):
+        """Recover towards the configured rate after a clean response."""
+        with self._lock:
+            bucket = self._bucket(domain, tier)
+            bucket.rate = min(bucket.base_rate, bucket.rate + bucket.base_rate / 10)
+            if bucket.rate == bucket.base_rate:
+                bucket.cooldown = 0.0
+
+    def stats(self) -> dict:
+        stats = {}
+        with self._lock:
+            for (domain, tier), bucket in self._buckets.items():
+                stats.setdefault(domain, {})[tier] = {
+                    "requests_per_minute": round(bucket.rate * 60, 2),
+                    "configured_per_minute": round(bucket.base_rate * 60, 2),
+                    "blocks": bucket.blocks,
+                    "paused_for": round(max(0.0, bucket.blocked_until - time.monotonic()), 1),
+                }
+        return stats
+
+
+# Shared by every scraper in the process
+rate_limiter = DomainRateLimiter()
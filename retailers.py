@@ -0,0 +1,378 @@
+"""
+Registry of supported retailers.
+
+Each retailer is a plain data spec: search URL template, selector lists,
+scroll policy, politeness budget and product-page price paths. The browser
+engine (scrape_engine.py), the static HTML parser (http_scraper.py) and the
+product-page lookup (product_page.py) all read from these specs, so adding
+a retailer means registering one more spec, not writing a new scraper.
+Selectors in each list are tried in order until one matches.
+"""
+import os
+import re
+import hashlib
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, parse_qsl, unquote, urlencode, urljoin, urlsplit, urlunsplit
+
+# Fields every spec must define; everything else falls back to RETAILER_DEFAULTS
+REQUIRED_FIELDS = (
+    "name", "domain", "base_url", "search_url", "ready_selectors",
+    "product_selectors", "title_selectors", "price_selectors", "url_selectors",
+)
+
+RETAILER_DEFAULTS = {
+    "ready_timeout": 15,
+    "scroll_steps": 0,
+    "scroll_px": 0,
+    "requests_per_minute": 30,
+    "scrape_timeout": 45,
+    "max_products": 10,
+    "image_selectors": [],
+    "rating_selector": None,
+    "rating_attribute": None,
+    "reviews_selector": None,
+    # Browser setup applied before navigating: extra request headers (sent with
+    # a rotated User-Agent) and/or a rotated User-Agent override
+    "extra_headers": {},
+    "user_agent_override": False,
+    "product_price_paths": [],
+    "product_price_selectors": [],
+    "block_markers": [],
+    # Canonical product identity: regexes whose first group is the retailer's
+    # product id, the path of the canonical URL for an id, and query parameters
+    # of ad/redirect links that carry the real product URL
+    "product_id_patterns": [],
+    "product_path": None,
+    "redirect_params": [],
+    # Resource groups from scrape_engine.RESOURCE_BLOCK_PROFILE blocked in the
+    # browser (None uses SCRAPE_BLOCKED_RESOURCES), and URLs that must still load
+    "blocked_resources": None,
+    "resource_allowlist": [],
+}
+
+# Query parameters that never change which product a URL points at
+TRACKING_PARAMS = re.compile(r"^(?:utm_\w+|ref|ref_|tag|pf_rd_\w+|pd_rd_\w+|qid|sr|crid|sprefix|keywords|th|psc|content-id|_encoding|smid|spla|sp_csd|afid|wmlspartner|adid|clicktrackid)$", re.I)
+
+RETAILERS = {}
+
+
+def register_retailer(spec: dict) -> dict:
+    """
+    Validate a retailer spec, fill in defaults and add it to RETAILERS.
+
+    The per-retailer deadline can be overridden with <NAME>_SCRAPE_TIMEOUT.
+
+    Args:
+        spec (dict): Retailer spec with at least the REQUIRED_FIELDS
+
+    Returns:
+        dict: The registered spec
+    """
+    missing = [field for field in REQUIRED_FIELDS if not spec.get(field)]
+    if missing:
+        raise ValueError(f"Retailer spec {spec.get('name')!r} is missing: {', '.join(missing)}")
+    spec = {**RETAILER_DEFAULTS, **spec}
+    spec["scrape_timeout"] = float(os.getenv(f"{spec['name'].upper()}_SCRAPE_TIMEOUT", spec["scrape_timeout"]))
+    spec["product_id_patterns"] = [re.compile(pattern) for pattern in spec["product_id_patterns"]]
+    RETAILERS[spec["name"]] = spec
+    return spec
+
+
+AMAZON = register_retailer({
+    "name": "Amazon",
+    "domain": "amazon.com",
+    "base_url": "https://www.amazon.com",
+    "search_url": "https://www.amazon.com/s?k={query}",
+    "ready_selectors": ["div.s-main-slot"],
+    "ready_timeout": 15,
+    # Scroll policy for lazily rendered result grids
+    "scroll_steps": 0,
+    "scroll_px": 0,
+    # Politeness budget shared by every scraper hitting this domain
+    "requests_per_minute": 20,
+    "scrape_timeout": 45,
+    "product_selectors": [
+        "div.s-result-item[data-component-type='s-search-result']",
+        "div.sg-col-4-of-12",
+        "div.sg-col-4-of-16"
+    ],
+    "max_products": 10,
+    "title_selectors": [
+        "h2 a span",
+        "h2 span.a-text-normal",
+        "span.a-text-normal",
+        "a.a-link-normal span"
+    ],
+    "price_selectors": [
+        "span.a-price span.a-offscreen",
+        "span.a-price-whole",
+        "span.a-price"
+    ],
+    "url_selectors": [
+        "h2 a",
+        "a.a-link-normal",
+        "a[href*='/dp/']"
+    ],
+    "image_selectors": ["img.s-image", "img[data-image-load]"],
+    "rating_selector": "span.a-icon-alt",
+    "rating_attribute": None,
+    "reviews_selector": "span.a-size-base.s-underline-text",
+    "product_price_paths": [],
+    "product_price_selectors": [
+        "#corePrice_feature_div span.a-offscreen",
+        "#corePriceDisplay_desktop_feature_div span.a-offscreen",
+        "#priceblock_ourprice",
+        "#priceblock_dealprice",
+        "span.a-price span.a-offscreen"
+    ],
+    # ASIN, from /dp/, /gp/product/ and mobile links; sponsored results go through /sspa/click?url=...
+    "product_id_patterns": [r"/(?:dp|gp/product|gp/aw/d|exec/obidos/ASIN)/([A-Z0-9]{10})(?:[/?]|$)"],
+    "product_path": "/dp/{id}",
+    "redirect_params": ["url"],
+    "block_markers": [
+        "/errors/validateCaptcha",
+        "Enter the characters you see below",
+        "api-services-support@amazon.com"
+    ],
+})
+
+WALMART = register_retailer({
+    "name": "Walmart",
+    "domain": "walmart.com",
+    "base_url": "https://www.walmart.com",
+    "search_url": "https://www.walmart.com/search?q={query}",
+    "ready_selectors": [
+        "div[data-item-id]",
+        "div[data-testid='search-results']",
+        "section[data-testid='search-results']",
+        "div[class*='SearchResultsGridView']"
+    ],
+    "ready_timeout": 20,
+    # Scroll policy for lazily rendered result grids
+    "scroll_steps": 5,
+    "scroll_px": 1000,
+    # Politeness budget shared by every scraper hitting this domain
+    "requests_per_minute": 12,
+    "scrape_timeout": 60,
+    "extra_headers": {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+        "Cache-Control": "max-age=0"
+    },
+    "product_selectors": [
+        "div[data-item-id]",
+        "div[data-testid='search-result']",
+        "div[class*='SearchResultsGridView'] > div",
+        "div[data-automation-id='product']"
+    ],
+    "max_products": 15,
+    "title_selectors": [
+        "span[data-automation-id='product-title']",
+        "span.w_kV",
+        "div[class*='heading'] span",
+        "a[class*='product-title-link']",
+        "*[class*='title']"
+    ],
+    "price_selectors": [
+        "div[data-automation-id='product-price']",
+        "span[class*='price-characteristic']",
+        "span[class*='price']",
+        "div[class*='price-box']",
+        "*[class*='price']"
+    ],
+    "url_selectors": [
+        "a[link-identifier='linkText']",
+        "a[class*='product-title-link']",
+        "a[href*='/ip/']",
+        "a"
+    ],
+    "image_selectors": ["img"],
+    "rating_selector": "span[class*='rating']",
+    "rating_attribute": "aria-label",
+    "reviews_selector": None,
+    "product_price_paths": [
+        "props.pageProps.initialData.data.product.priceInfo.currentPrice.price",
+        "props.pageProps.initialData.data.product.priceInfo.priceRange.minPrice"
+    ],
+    "product_price_selectors": [
+        "span[itemprop='price']",
+        "[data-testid='price-wrap'] span[itemprop='price']",
+        "[data-seo-id='hero-price']"
+    ],
+    # Item id, the numeric last segment of /ip/<slug>/<id>; sponsored results go through /sp/track?rd=...
+    "product_id_patterns": [r"/ip/(?:[^/?]+/)?(\d{5,})(?:[/?]|$)"],
+    "product_path": "/ip/{id}",
+    "redirect_params": ["rd"],
+    # Bot-detection sensor; without it every search gets the "Robot or human?" page
+    "resource_allowlist": ["https://client.px-cloud.net/*", "https://www.walmart.com/px/*"],
+    "block_markers": [
+        "Robot or human?",
+        "px-captcha",
+        "/blocked?url="
+    ],
+})
+
+TARGET = register_retailer({
+    "name": "Target",
+    "domain": "target.com",
+    "base_url": "https://www.target.com",
+    "search_url": "https://www.target.com/s?searchTerm={query}",
+    "ready_selectors": [
+        "[data-test='product-grid']",
+        "[data-test='product-card']",
+        "[data-test='product-results']"
+    ],
+    "ready_timeout": 15,
+    # Scroll policy for lazily rendered result grids
+    "scroll_steps": 3,
+    "scroll_px": 800,
+    # Politeness budget shared by every scraper hitting this domain
+    "requests_per_minute": 15,
+    "scrape_timeout": 50,
+    "user_agent_override": True,
+    "product_selectors": [
+        "[data-test='product-card']",
+        "[data-test='product-grid'] > div",
+        "div[data-test='product-card-default']"
+    ],
+    "max_products": 10,
+    "title_selectors": [
+        "[data-test='product-title']",
+        "a[href*='/p/']",
+        "div[class*='Heading']"
+    ],
+    "price_selectors": [
+        "[data-test='product-price']",
+        "span[data-test='current-price']",
+        "div[data-test='product-price']"
+    ],
+    "url_selectors": [
+        "a[href*='/p/']",
+        "[data-test='product-title'] a",
+        "a[data-test='product-link']"
+    ],
+    "image_selectors": [],
+    "rating_selector": None,
+    "rating_attribute": None,
+    "reviews_selector": None,
+    "product_price_paths": [
+        "props.pageProps.__PRELOADED_QUERIES__.queries.0.1.data.product.price.current_retail",
+        "props.pageProps.product.price.current_retail"
+    ],
+    "product_price_selectors": [
+        "[data-test='product-price']",
+        "span[data-test='product-price']"
+    ],
+    # TCIN, from /p/<slug>/-/A-<tcin>
+    "product_id_patterns": [r"/A-(\d+)(?:[/?#]|$)"],
+    "product_path": "/p/-/A-{id}",
+    # Results are rendered client-side from the redsky API by scripts on the asset CDN
+    "resource_allowlist": ["https://redsky.target.com/*", "https://assets.targetimg1.com/*.js"],
+    "block_markers": [
+        "captcha-delivery",
+        "Access Denied"
+    ],
+})
+
+
+def build_search_url(spec: dict, query: str) -> str:
+    return spec["search_url"].format(query=query.replace(' ', '+'))
+
+
+def _on_domain(url: str, domain: str) -> bool:
+    """Whether `url`'s host is `domain` or one of its subdomains; www.notamazon.com is not amazon.com."""
+    # Scheme-less URLs ("amazon.com/dp/...") would otherwise parse as a bare path
+    host = urlsplit(url if "//" in url else f"//{url}").hostname or ""
+    return host == domain or host.endswith("." + domain)
+
+
+def retailer_for_url(url: str):
+    """Return the spec whose domain hosts `url`, or None for unsupported sites."""
+    for spec in RETAILERS.values():
+        if _on_domain(url, spec["domain"]):
+            return spec
+    return None
+
+
+def find_block_marker(html: str, spec: dict):
+    """Return the first CAPTCHA/block-page marker found in `html`, or None."""
+    for marker in spec.get("block_markers", []):
+        if marker in html:
+            return marker
+    return None
+
+
+def _unwrap_redirect(url: str, spec: dict) -> str:
+    """Follow ad/redirect links (e.g. Amazon's /sspa/click?url=...) to the product URL they carry."""
+    params = parse_qs(urlsplit(url).query)
+    for name in spec["redirect_params"]:
+        for target in params.get(name, []):
+            target = unquote(target)
+            if target.startswith("/") or _on_domain(target, spec["domain"]):
+                return urljoin(spec["base_url"], target)
+    return url
+
+
+def canonical_product(url: str) -> Optional[Tuple[dict, str]]:
+    """
+    Identify the product a URL points at.
+
+    Returns:
+        Optional[Tuple[dict, str]]: The retailer spec and its canonical product
+            id (ASIN, Walmart item id, TCIN), or None when the URL is not a
+            recognisable product page
+    """
+    url = url.strip()
+    spec = retailer_for_url(url)
+    if not spec:
+        return None
+    url = _unwrap_redirect(url, spec)
+    for pattern in spec["product_id_patterns"]:
+        match = pattern.search(urlsplit(url).path)
+        if match:
+            return spec, match.group(1)
+    return None
+
+
+def normalize_product_url(url: str) -> str:
+    """
+    Rewrite a product URL to one stable form before it is stored or compared.
+
+    Recognised products become the retailer's canonical URL (e.g.
+    https://www.amazon.com/dp/<ASIN>); other URLs lose their fragment and
+    tracking parameters.
+    """
+    url = url.strip()
+    product = canonical_product(url)
+    if product:
+        spec, product_id = product
+        return spec["base_url"] + spec["product_path"].format(id=product_id)
+    parts = urlsplit(url)
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not TRACKING_PARAMS.match(k)])
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ""))
+
+
+def product_key(url: str) -> str:
+    """
+    Group key for a product URL.
+
+    `<retailer>:<canonical id>` for recognised products, so every link to the
+    same item shares one key; otherwise host and path without query string,
+    fragment or trailing slash.
+    """
+    product = canonical_product(url)
+    if product:
+        spec, product_id = product
+        return f"{spec['name'].lower()}:{product_id}"
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def product_id_for_url(url: str) -> str:
+    """Short, URL-safe product id derived from product_key."""
+    return hashlib.sha1(product_key(url).encode("utf-8")).hexdigest()[:16]
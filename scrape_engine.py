@@ -0,0 +1,214 @@
+"""
+Browser scraping engine shared by every registered retailer.
+
+One code path drives a WebDriver through a search for any spec in
+retailers.RETAILERS: browser setup (extra headers / User-Agent rotation,
+blocked resources), rate-limited navigation with a single readiness wait
+and block detection, DOM-driven scrolling, and single-pass card extraction
+via page_extract.
+"""
+import os
+import time
+import random
+import logging
+from fnmatch import fnmatchcase
+from typing import List, Optional
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+from http_scraper import SCRAPE_STAGE_SECONDS, DeadlineExceeded, time_left
+from page_extract import extract_products
+from rate_limit import BROWSER, rate_limiter
+from retailers import build_search_url, find_block_marker
+
+logger = logging.getLogger(__name__)
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0"
+]
+
+
+def get_random_user_agent():
+    return random.choice(USER_AGENTS)
+
+
+# URL patterns (Network.setBlockedURLs wildcards) for resources scrapers never
+# need: we only read text, prices, hrefs and img src attributes, which are
+# present in the DOM whether or not the image itself is downloaded
+RESOURCE_BLOCK_PROFILE = {
+    "images": ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+               "*.jpg?*", "*.jpeg?*", "*.png?*", "*.gif?*", "*.webp?*", "*.avif?*", "*.svg?*"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.woff?*", "*.woff2?*", "*.ttf?*"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.ts?*", "*.mp3", "*.mp4?*", "*.webm?*", "*.m3u8?*"],
+    "trackers": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+        "*googleadservices.com*", "*facebook.net*", "*connect.facebook.*", "*amazon-adsystem.com*",
+        "*adsrvr.org*", "*criteo.*", "*scorecardresearch.com*", "*hotjar.com*", "*bat.bing.com*",
+        "*quantserve.com*", "*adobedtm.com*", "*omtrdc.net*", "*demdex.net*", "*branch.io*",
+        "*analytics.tiktok.com*", "*ct.pinterest.com*", "*fls-na.amazon.com*", "*unagi.amazon.com*",
+    ],
+}
+
+# Comma-separated RESOURCE_BLOCK_PROFILE groups blocked for retailers that do
+# not set their own "blocked_resources"; empty disables blocking
+SCRAPE_BLOCKED_RESOURCES = [
+    group.strip()
+    for group in os.getenv("SCRAPE_BLOCKED_RESOURCES", "images,fonts,media,trackers").split(",")
+    if group.strip()
+]
+
+
+def blocked_url_patterns(spec: dict) -> List[str]:
+    """
+    Patterns to block for a retailer.
+
+    A pattern is dropped when it would match an entry of the spec's
+    "resource_allowlist", so scripts a retailer needs to render results keep
+    loading even if they live on a blocked host or use a blocked extension.
+    """
+    groups = spec["blocked_resources"] if spec["blocked_resources"] is not None else SCRAPE_BLOCKED_RESOURCES
+    patterns = []
+    for group in groups:
+        for pattern in RESOURCE_BLOCK_PROFILE[group]:
+            # CDP patterns only treat "*" as a wildcard
+            wildcard = pattern.replace("?", "[?]")
+            if not any(fnmatchcase(allowed, wildcard) for allowed in spec["resource_allowlist"]):
+                patterns.append(pattern)
+    return patterns
+
+
+def block_resources(driver, spec: dict):
+    # Set on every lease: pooled browsers move between retailers with different allowlists
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_url_patterns(spec)})
+
+
+def prepare_browser(driver, spec: dict):
+    # Cookies, storage, extra headers and the UA override are reset by the driver pool between leases
+    block_resources(driver, spec)
+    if spec["extra_headers"]:
+        driver.execute_cdp_cmd('Network.setExtraHTTPHeaders', {
+            'headers': {'User-Agent': get_random_user_agent(), **spec["extra_headers"]}
+        })
+    if spec["user_agent_override"]:
+        driver.execute_cdp_cmd('Network.setUserAgentOverride', {
+            "userAgent": get_random_user_agent()
+        })
+
+
+def apply_deadline(driver, deadline: Optional[float]):
+    # Bounds driver.get and execute_script, which cannot be interrupted from outside
+    left = time_left(deadline)
+    if left is not None:
+        driver.set_page_load_timeout(left)
+        driver.set_script_timeout(left)
+
+
+def _wait_seconds(seconds: float, deadline: Optional[float]) -> float:
+    left = time_left(deadline)
+    return seconds if left is None else min(seconds, left)
+
+
+def navigate(driver, spec: dict, url: str, timings: Optional[dict] = None, deadline: Optional[float] = None) -> bool:
+    # The caller took the domain's browser slot before leasing the driver
+    timings = {} if timings is None else timings
+
+    started = time.perf_counter()
+    apply_deadline(driver, deadline)
+    driver.get(url)
+    timings["navigate"] = time.perf_counter() - started
+
+    # One explicit wait for any of the result selectors
+    started = time.perf_counter()
+    try:
+        WebDriverWait(driver, _wait_seconds(spec["ready_timeout"], deadline)).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(spec["ready_selectors"])))
+        )
+        timings["wait"] = time.perf_counter() - started
+    except TimeoutException:
+        timings["wait"] = time.perf_counter() - started
+        marker = find_block_marker(driver.page_source, spec)
+        if marker:
+            rate_limiter.report_blocked(spec["domain"], BROWSER)
+            logger.warning(f"{spec['name']} served a block page ({marker})")
+        else:
+            logger.warning(f"Could not find {spec['name']} search results")
+        return False
+
+    rate_limiter.report_success(spec["domain"], BROWSER)
+    return True
+
+
+def scroll_until_loaded(driver, spec: dict, deadline: Optional[float] = None):
+    # Scroll while new product cards keep appearing, waiting on the DOM rather than a timer
+    selector = ", ".join(spec["product_selectors"])
+    count = len(driver.find_elements(By.CSS_SELECTOR, selector))
+    for _ in range(spec["scroll_steps"]):
+        wait = _wait_seconds(1.5, deadline)
+        driver.execute_script(f"window.scrollBy(0, {spec['scroll_px']})")
+        try:
+            WebDriverWait(driver, wait, poll_frequency=0.2).until(
+                lambda d: len(d.find_elements(By.CSS_SELECTOR, selector)) > count
+            )
+        except TimeoutException:
+            break
+        count = len(driver.find_elements(By.CSS_SELECTOR, selector))
+
+
+def scrape_search(driver, spec: dict, query: str, timings: Optional[dict] = None,
+                  deadline: Optional[float] = None) -> List[dict]:
+    """
+    Run one search on a retailer in the given browser.
+
+    Callers take the domain's browser rate-limit slot (rate_limit.BROWSER)
+    before leasing the driver, so no browser is held while a paused domain
+    waits.
+
+    Args:
+        driver: WebDriver leased from the pool
+        spec (dict): Registered retailer spec
+        query (str): Search terms
+        timings (dict, optional): Filled with seconds spent per stage
+            (navigate, wait, scroll, extract)
+        deadline (float, optional): time.monotonic() by which to give up;
+            bounds page loads, scripts and waits and is checked between steps
+
+    Returns:
+        List[dict]: Product dicts (title, price, url, image_url, rating, reviews_count);
+            empty when the page is blocked, has no results or fails to load
+    """
+    timings = {} if timings is None else timings
+    items = []
+    try:
+        url = build_search_url(spec, query)
+        logger.info(f"Scraping {spec['name']}: {url}")
+
+        prepare_browser(driver, spec)
+        if not navigate(driver, spec, url, timings, deadline):
+            return items
+        if spec["scroll_steps"]:
+            started = time.perf_counter()
+            scroll_until_loaded(driver, spec, deadline)
+            timings["scroll"] = time.perf_counter() - started
+
+        # Evaluate every product card in a single round trip
+        started = time.perf_counter()
+        apply_deadline(driver, deadline)
+        items = extract_products(driver, spec)
+        timings["extract"] = time.perf_counter() - started
+    except DeadlineExceeded:
+        logger.warning(f"Stopped scraping {spec['name']} at its deadline")
+    except Exception as e:
+        logger.error(f"Error scraping {spec['name']}: {str(e)}")
+    finally:
+        for stage, seconds in timings.items():
+            SCRAPE_STAGE_SECONDS.observe(seconds, retailer=spec["name"], tier="browser", stage=stage)
+
+    logger.info(f"Successfully scraped {len(items)} products from {spec['name']}")
+    return items
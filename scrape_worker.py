@@ -0,0 +1,138 @@
+"""
+Scrape worker processes for queued search jobs.
+
+Each worker is a separate process with its own browser pool
+(search_service.driver_pool). It claims jobs from the database queue
+(search_jobs) one at a time, runs the retailers concurrently and reports
+each retailer's results as they finish. The API process never drives these
+browsers, so a browser crash can take down at most one worker, which the
+pool's supervisor restarts, and scrape capacity is set by the number of
+workers rather than by API processes.
+
+The API starts SEARCH_WORKERS of them; with SEARCH_WORKERS=0 they can run
+on their own, on this or another host sharing the database:
+
+    python scrape_worker.py --workers 4
+"""
+import os
+import time
+import asyncio
+import logging
+import argparse
+import threading
+import multiprocessing
+from typing import List
+
+from search_jobs import claim_next_job, fail_job, finish_job, purge_finished_jobs, record_progress
+from search_service import driver_pool, search_retailer, summarize_search
+from models import init_db, session_scope
+
+logger = logging.getLogger(__name__)
+
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "2"))
+SEARCH_JOB_POLL_SECONDS = float(os.getenv("SEARCH_JOB_POLL_SECONDS", "0.5"))
+PURGE_INTERVAL_SECONDS = 3600
+SUPERVISE_INTERVAL_SECONDS = 2
+
+
+async def run_job(job_id: str, owner: str, query: str, retailers: List[str]):
+    started = time.monotonic()
+    outcomes = []
+    for next_done in asyncio.as_completed([search_retailer(source, query, started) for source in retailers]):
+        source, results, status = await next_done
+        outcomes.append((source, results, status))
+        record_progress(job_id, owner, source, status, results)
+    finish_job(job_id, owner, summarize_search(outcomes))
+
+
+def work(stop):
+    """Main loop of one worker process: claim, run, repeat until `stop` is set."""
+    logging.basicConfig(level=logging.INFO)
+    # Workers may start before, or without, an API process on this database
+    init_db()
+    logger.info(f"Scrape worker {os.getpid()} started")
+    last_purge = 0.0
+    try:
+        while not stop.is_set():
+            with session_scope() as db:
+                job = claim_next_job(db)
+                if job is None and time.monotonic() - last_purge > PURGE_INTERVAL_SECONDS:
+                    purge_finished_jobs(db)
+                    last_purge = time.monotonic()
+            if job is None:
+                stop.wait(SEARCH_JOB_POLL_SECONDS)
+                continue
+
+            job_id, owner, query, retailers = job
+            logger.info(f"Running search job {job_id} for {query!r}")
+            try:
+                asyncio.run(run_job(job_id, owner, query, retailers))
+            except Exception as e:
+                logger.error(f"Search job {job_id} failed: {str(e)}")
+                fail_job(job_id, owner, str(e))
+    finally:
+        driver_pool.close()
+
+
+class SearchWorkerPool:
+    """Starts `workers` scrape worker processes and restarts any that die."""
+
+    def __init__(self, workers: int = SEARCH_WORKERS):
+        self.workers = workers
+        # Spawned, not forked: children must not inherit the parent's threads, browsers or DB connections
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._processes = []
+        self._restarts = 0
+        self._supervisor = None
+
+    def _spawn(self):
+        process = self._context.Process(target=work, args=(self._stop,), name="scrape-worker", daemon=True)
+        process.start()
+        return process
+
+    def start(self):
+        if not self.workers:
+            return
+        self._processes = [self._spawn() for _ in range(self.workers)]
+        self._supervisor = threading.Thread(target=self._supervise, name="scrape-worker-supervisor", daemon=True)
+        self._supervisor.start()
+        logger.info(f"Started {self.workers} scrape workers")
+
+    def _supervise(self):
+        while not self._stop.wait(SUPERVISE_INTERVAL_SECONDS):
+            for index, process in enumerate(self._processes):
+                if not process.is_alive() and not self._stop.is_set():
+                    # Its job's lease expires and the job is claimed again by another worker
+                    logger.error(f"Scrape worker {process.pid} exited with code {process.exitcode}; restarting")
+                    self._processes[index] = self._spawn()
+                    self._restarts += 1
+
+    def close(self, timeout: float = 10):
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "alive": sum(1 for process in self._processes if process.is_alive()),
+            "restarts": self._restarts,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run scrape worker processes for queued search jobs")
+    parser.add_argument("--workers", type=int, default=max(SEARCH_WORKERS, 1))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    pool = SearchWorkerPool(args.workers)
+    pool.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.close()
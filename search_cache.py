@@ -0,0 +1,125 @@
+import os
+import re
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "900"))
+SEARCH_CACHE_STALE_TTL = float(os.getenv("SEARCH_CACHE_STALE_TTL", "3600"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256"))
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so near-identical queries share a key."""
+    query = _NON_WORD.sub(" ", query.lower())
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+def make_key(query: str, sources: Iterable[str]) -> Tuple[str, Tuple[str, ...]]:
+    return normalize_query(query), tuple(sorted(sources))
+
+
+class SearchCache:
+    """
+    TTL + LRU cache for search responses with single-flight coalescing.
+
+    Entries younger than `ttl` are served as hits. Entries between `ttl` and
+    `ttl + stale_ttl` are served immediately as stale while one background
+    task refreshes them. Concurrent misses for the same key await a single
+    shared fetch.
+    """
+
+    def __init__(self, ttl: float = SEARCH_CACHE_TTL, stale_ttl: float = SEARCH_CACHE_STALE_TTL,
+                 max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._background = set()
+
+    def _store(self, key, value):
+        self._entries[key] = (value, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _start_fetch(self, key, fetch: Callable[[], Awaitable[dict]],
+                     cacheable: Callable[[dict], bool]) -> asyncio.Task:
+        async def run():
+            try:
+                value = await fetch()
+                if cacheable(value):
+                    self._store(key, value)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+        return task
+
+    async def get_or_fetch(self, key, fetch: Callable[[], Awaitable[dict]],
+                           cacheable: Callable[[dict], bool] = lambda value: True) -> Tuple[dict, dict]:
+        """Return `(value, cache_info)` where cache_info reports the status and data age in seconds."""
+        entry = self._entries.get(key)
+        if entry:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                return value, {"status": "hit", "age": round(age, 1)}
+            if age < self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    logger.info(f"Revalidating stale search cache entry: {key}")
+                    task = self._start_fetch(key, fetch, cacheable)
+                    self._background.add(task)
+                    task.add_done_callback(self._finish_background)
+                return value, {"status": "stale", "age": round(age, 1)}
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task:
+            value = await asyncio.shield(task)
+            return value, {"status": "coalesced", "age": 0.0}
+
+        value = await asyncio.shield(self._start_fetch(key, fetch, cacheable))
+        return value, {"status": "miss", "age": 0.0}
+
+    def peek(self, key) -> Optional[Tuple[dict, dict]]:
+        """Return `(value, cache_info)` for a fresh entry, or None; never fetches."""
+        entry = self._entries.get(key)
+        if not entry:
+            return None
+        value, stored_at = entry
+        age = time.time() - stored_at
+        if age >= self.ttl:
+            return None
+        self._entries.move_to_end(key)
+        return value, {"status": "hit", "age": round(age, 1)}
+
+    def put(self, key, value: dict):
+        """Store a response produced outside get_or_fetch, e.g. by a streamed search."""
+        self._store(key, value)
+
+    def _finish_background(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Background search revalidation failed: {str(task.exception())}")
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+        }
@@ -0,0 +1,173 @@
+"""
+Search job queue stored in the database.
+
+POST /search adds a SearchJob and returns its id at once. Scrape worker
+processes (scrape_worker.py) claim queued jobs with a time-limited lease,
+the same way alert sweeps claim alerts, and write each retailer's results
+to the job as soon as that retailer finishes. A job whose worker died is
+claimed again once its lease expires, up to SEARCH_JOB_MAX_ATTEMPTS times.
+"""
+import os
+import uuid
+import socket
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, delete, or_, select, update
+
+from models import SearchJob, session_scope
+
+logger = logging.getLogger(__name__)
+
+# Must outlast the slowest retailer's scrape_timeout; renewed as retailers finish
+SEARCH_JOB_LEASE_SECONDS = float(os.getenv("SEARCH_JOB_LEASE_SECONDS", "120"))
+SEARCH_JOB_MAX_ATTEMPTS = int(os.getenv("SEARCH_JOB_MAX_ATTEMPTS", "2"))
+SEARCH_JOB_RETENTION_HOURS = float(os.getenv("SEARCH_JOB_RETENTION_HOURS", "24"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def enqueue_search(db, query: str, retailers: List[str]) -> SearchJob:
+    job = SearchJob(id=uuid.uuid4().hex, query=query, retailers=retailers, status=QUEUED, progress={}, results=[])
+    db.add(job)
+    db.commit()
+    return job
+
+
+def completed_search(db, query: str, retailers: List[str], response: dict) -> SearchJob:
+    """Record a job that needs no worker because its response is already known (e.g. cached)."""
+    now = datetime.utcnow()
+    job = SearchJob(
+        id=uuid.uuid4().hex, query=query, retailers=retailers, status=DONE,
+        progress=response["sources"], results=jsonable_encoder(response["results"]),
+        started_at=now, finished_at=now
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def claim_next_job(db) -> Optional[Tuple[str, str, str, List[str]]]:
+    """
+    Lease the oldest runnable job to this caller.
+
+    Returns:
+        Optional[Tuple[str, str, str, List[str]]]: (job id, lease owner, query,
+            retailers), or None when nothing is queued
+    """
+    now = datetime.utcnow()
+    expired = and_(SearchJob.status == RUNNING, SearchJob.lease_expires_at < now)
+
+    # Jobs whose workers kept dying are given up on rather than retried forever
+    db.execute(
+        update(SearchJob)
+        .where(expired, SearchJob.attempts >= SEARCH_JOB_MAX_ATTEMPTS)
+        .values(status=FAILED, error="Scrape worker stopped before finishing", finished_at=now, lease_owner=None)
+        .execution_options(synchronize_session=False)
+    )
+
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+    claimable = or_(SearchJob.status == QUEUED, expired)
+    candidate = (
+        select(SearchJob.id)
+        .where(claimable)
+        .order_by(SearchJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = db.execute(
+        update(SearchJob)
+        .where(SearchJob.id == candidate.scalar_subquery(), claimable)
+        .values(
+            # A retried job starts over rather than mixing in a dead worker's partial results
+            status=RUNNING, lease_owner=owner, started_at=now, attempts=SearchJob.attempts + 1,
+            progress={}, results=[],
+            lease_expires_at=now + timedelta(seconds=SEARCH_JOB_LEASE_SECONDS)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if not claimed.rowcount:
+        return None
+    job = db.query(SearchJob).filter(SearchJob.lease_owner == owner).one()
+    return job.id, owner, job.query, list(job.retailers)
+
+
+def _owned_job(db, job_id: str, owner: str) -> Optional[SearchJob]:
+    job = db.get(SearchJob, job_id)
+    if job is None or job.lease_owner != owner or job.status != RUNNING:
+        # The lease expired and another worker took over; its results win
+        logger.warning(f"Search job {job_id} is no longer leased to this worker")
+        return None
+    return job
+
+
+def record_progress(job_id: str, owner: str, source: str, status: dict, results: list):
+    """Add one retailer's results to a running job and renew its lease."""
+    with session_scope() as db:
+        job = _owned_job(db, job_id, owner)
+        if job is None:
+            return
+        job.progress = {**job.progress, source: status}
+        job.results = job.results + jsonable_encoder(results)
+        job.lease_expires_at = datetime.utcnow() + timedelta(seconds=SEARCH_JOB_LEASE_SECONDS)
+
+
+def finish_job(job_id: str, owner: str, response: dict):
+    with session_scope() as db:
+        job = _owned_job(db, job_id, owner)
+        if job is None:
+            return
+        job.status = DONE
+        job.progress = response["sources"]
+        job.results = jsonable_encoder(response["results"])
+        job.finished_at = datetime.utcnow()
+        job.lease_owner = None
+
+
+def fail_job(job_id: str, owner: str, error: str):
+    with session_scope() as db:
+        job = _owned_job(db, job_id, owner)
+        if job is None:
+            return
+        job.status = FAILED
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        job.lease_owner = None
+
+
+def purge_finished_jobs(db) -> int:
+    """Delete finished jobs older than SEARCH_JOB_RETENTION_HOURS."""
+    cutoff = datetime.utcnow() - timedelta(hours=SEARCH_JOB_RETENTION_HOURS)
+    deleted = db.execute(
+        delete(SearchJob).where(SearchJob.status.in_([DONE, FAILED]), SearchJob.finished_at < cutoff)
+    )
+    db.commit()
+    return deleted.rowcount
+
+
+def job_view(job: SearchJob) -> dict:
+    """Public form of a job for GET /search/jobs/{id}."""
+    results = job.results if job.status == DONE else sorted(job.results, key=lambda r: r["price"])
+    return {
+        "job_id": job.id,
+        "query": job.query,
+        "status": job.status,
+        "retailers": job.retailers,
+        "progress": {
+            "finished": len(job.progress),
+            "total": len(job.retailers),
+            "sources": job.progress,
+        },
+        "results": results,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
@@ -0,0 +1,222 @@
+"""
+Search pipeline shared by the API and the scrape worker processes.
+
+A search fans out to every selected retailer at once. Each retailer is
+tried with a plain HTTP fetch first and falls back to a browser leased
+from this process's driver pool; results are normalized to canonical
+product URLs, deduplicated and recorded in the price history. Nothing here
+depends on the FastAPI app, so scrape workers (scrape_worker.py) can import
+it without starting the API's scheduler.
+"""
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+import metrics
+from catalog import ensure_products
+from driver_pool import DriverPool, PoolExhausted
+from http_scraper import try_static, tier_stats, time_left, SCRAPE_STAGE_SECONDS
+from models import session_scope
+from price_history import record_observations
+from rate_limit import BROWSER, RateLimitTimeout, rate_limiter
+from retailers import AMAZON, WALMART, TARGET, RETAILERS, normalize_product_url, product_id_for_url
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+logger = logging.getLogger(__name__)
+
+
+class ProductResult(BaseModel):
+    title: str
+    price: float
+    url: str
+    source: str
+    image_url: Optional[str] = None
+    rating: Optional[float] = None
+    reviews_count: Optional[int] = None
+    product_id: Optional[str] = None
+
+
+def setup_driver():
+    # Selenium and undetected-chromedriver load with the first browser, keeping startup
+    # fast for processes that never open one
+    import undetected_chromedriver as uc
+    from scrape_engine import get_random_user_agent
+
+    try:
+        logger.info("Setting up undetected-chromedriver...")
+        options = uc.ChromeOptions()
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument(f"--user-agent={get_random_user_agent()}")
+
+        # Additional options to avoid detection
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--disable-notifications")
+
+        driver = uc.Chrome(options=options)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        logger.info("Successfully created driver with undetected-chromedriver")
+        return driver
+    except Exception as e:
+        logger.error(f"Error setting up ChromeDriver: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to initialize browser: {str(e)}")
+
+
+def scrape_with_spec(driver: "webdriver.Chrome", spec: dict, query: str,
+                     deadline: Optional[float] = None) -> List[ProductResult]:
+    from scrape_engine import scrape_search
+
+    items = scrape_search(driver, spec, query, deadline=deadline)
+    return [ProductResult(source=spec["name"], **item) for item in items]
+
+
+def scrape_amazon(driver: "webdriver.Chrome", query: str) -> List[ProductResult]:
+    return scrape_with_spec(driver, AMAZON, query)
+
+
+def scrape_walmart(driver: "webdriver.Chrome", query: str) -> List[ProductResult]:
+    return scrape_with_spec(driver, WALMART, query)
+
+
+def scrape_target(driver: "webdriver.Chrome", query: str) -> List[ProductResult]:
+    return scrape_with_spec(driver, TARGET, query)
+
+
+# Pool of warm browsers shared by searches and alert checks in this process
+driver_pool = DriverPool(setup_driver)
+
+# Dedicated executor for blocking scrape work; SCRAPE_WORKERS caps concurrent scrapes
+scrape_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SCRAPE_WORKERS", str(len(RETAILERS) * 2))),
+    thread_name_prefix="scrape"
+)
+
+# Per-retailer latency of a search, from fan-out to result or timeout
+SEARCH_SECONDS = metrics.histogram(
+    "price_tracker_search_retailer_seconds", "Time to search one retailer", ("retailer", "status")
+)
+
+
+def scrape_with_pooled_driver(source: str, query: str, deadline: float) -> List[ProductResult]:
+    spec = RETAILERS[source]
+    started = time.perf_counter()
+    # Rate-limit slot before the browser: waiting out a paused domain must not hold one,
+    # and neither wait may run past the retailer's deadline
+    rate_limiter.acquire(spec["domain"], BROWSER, timeout=time_left(deadline))
+    with driver_pool.lease(timeout=time_left(deadline)) as driver:
+        SCRAPE_STAGE_SECONDS.observe(time.perf_counter() - started, retailer=source, tier="browser", stage="acquire")
+        # The scrape stops itself at the deadline, so the browser returns to the pool
+        # even after search_retailer has stopped waiting for it
+        return scrape_with_spec(driver, spec, query, deadline)
+
+
+def record_search_prices(results: List[ProductResult]):
+    try:
+        with session_scope() as db:
+            ensure_products(db, [(r.url, r.title) for r in results])
+            record_observations(db, [(r.product_id, r.source, r.price) for r in results])
+    except Exception as e:
+        logger.error(f"Error recording price history: {str(e)}")
+
+
+def scrape_retailer(source: str, query: str, deadline: float) -> List[ProductResult]:
+    # Try the plain HTTP tier first, then fall back to a full browser
+    items = try_static(RETAILERS[source], query, deadline)
+    if items:
+        results = [ProductResult(source=source, **item) for item in items]
+    else:
+        started = time.monotonic()
+        try:
+            results = scrape_with_pooled_driver(source, query, deadline)
+        finally:
+            tier_stats.record(source, "browser", time.monotonic() - started)
+
+    # Canonical URLs collapse sponsored and tracking-tagged duplicates of one product
+    unique = {}
+    for result in results:
+        result.url = normalize_product_url(result.url)
+        result.product_id = product_id_for_url(result.url)
+        unique.setdefault(result.product_id, result)
+    results = list(unique.values())
+    record_search_prices(results)
+    return results
+
+
+async def scrape_source(source: str, query: str) -> List[ProductResult]:
+    # Blocking Selenium work runs on the scrape executor so the event loop stays free
+    loop = asyncio.get_running_loop()
+    timeout = RETAILERS[source]["scrape_timeout"]
+    return await asyncio.wait_for(
+        loop.run_in_executor(scrape_executor, scrape_retailer, source, query, time.monotonic() + timeout),
+        timeout=timeout
+    )
+
+
+async def search_retailer(source: str, query: str, started: float):
+    try:
+        results = await scrape_source(source, query)
+        status = "ok" if results else "empty"
+        logger.info(f"Found {len(results)} {source} products")
+    except asyncio.TimeoutError:
+        results = []
+        status = "timeout"
+        logger.warning(f"{source} scrape timed out after {RETAILERS[source]['scrape_timeout']}s")
+    except RateLimitTimeout as e:
+        # The domain is paused after a block; skip it rather than wait past the deadline
+        results = []
+        status = "rate_limited"
+        logger.warning(f"Skipped {source}: {str(e)}")
+    except PoolExhausted as e:
+        results = []
+        status = "unavailable"
+        logger.error(f"No browser available for {source}: {str(e)}")
+    except Exception as e:
+        results = []
+        status = "error"
+        logger.error(f"Error scraping {source}: {str(e)}")
+    elapsed = time.monotonic() - started
+    SEARCH_SECONDS.observe(elapsed, retailer=source, status=status)
+    return source, results, {
+        "status": status,
+        "count": len(results),
+        "elapsed": round(elapsed, 3),
+    }
+
+
+def summarize_search(outcomes) -> dict:
+    all_results = []
+    sources = {}
+    for source, results, status in outcomes:
+        all_results.extend(results)
+        sources[source] = status
+
+    # Sort all results by price
+    sorted_results = sorted(all_results, key=lambda x: x.price)
+
+    logger.info(f"Total products found: {len(sorted_results)}")
+
+    return {"results": sorted_results, "sources": sources}
+
+
+async def run_search(query: str, selected: List[str]) -> dict:
+    started = time.monotonic()
+
+    # Fan out to all sources at once
+    outcomes = await asyncio.gather(*(search_retailer(source, query, started) for source in selected))
+    return summarize_search(outcomes)
+
+
+def is_complete_search(response: dict) -> bool:
+    # Only cache searches where every retailer actually answered
+    return all(s["status"] in ("ok", "empty") for s in response["sources"].values())
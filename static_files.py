@@ -0,0 +1,104 @@
+"""
+Frontend files served by the API.
+
+index.html and style.css are read once, hashed for an ETag and compressed
+ahead of time: gzip at level 9 and, when the brotli package is installed,
+brotli at quality 11. Those levels are too slow per request but cost
+nothing when paid once per file. Each request gets the smallest variant the
+client accepts, and a matching If-None-Match gets a 304 with no body.
+
+index.html is always revalidated (Cache-Control: no-cache) so a deploy
+shows up on the next load. It links style.css with its content hash as a
+version parameter, so the stylesheet itself can be cached for a year; a
+changed stylesheet changes the link. Files are re-read when their
+modification time changes.
+"""
+import os
+import gzip
+import hashlib
+import logging
+import threading
+from typing import Callable, Optional, Sequence
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from compression import brotli, preferred_encoding
+
+logger = logging.getLogger(__name__)
+
+FRONTEND_DIR = os.getenv("FRONTEND_DIR", os.path.dirname(os.path.abspath(__file__)))
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class StaticAsset:
+    def __init__(self, name: str, media_type: str, transform: Optional[Callable[[bytes], bytes]] = None,
+                 depends_on: Sequence["StaticAsset"] = ()):
+        self.name = name
+        self.path = os.path.join(FRONTEND_DIR, name)
+        self.media_type = media_type
+        self.transform = transform
+        self.depends_on = depends_on
+        self._lock = threading.Lock()
+        self._key = None
+        self.etag = None
+        self.variants = {}
+
+    def load(self):
+        """Read and compress the file if it, or a file its transform embeds, changed since the last load."""
+        key = (os.stat(self.path).st_mtime_ns, *(asset.version for asset in self.depends_on))
+        if key == self._key:
+            return
+        with self._lock:
+            if key == self._key:
+                return
+            with open(self.path, "rb") as f:
+                body = f.read()
+            if self.transform:
+                body = self.transform(body)
+            variants = {"identity": body}
+            compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli:
+                compressed["br"] = brotli.compress(body, quality=11)
+            # A variant is only worth sending when it is actually smaller
+            variants.update({name: data for name, data in compressed.items() if len(data) < len(body)})
+            self.variants = variants
+            self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            self._key = key
+            logger.info(f"Loaded {self.name}: " + ", ".join(f"{k} {len(v)} bytes" for k, v in variants.items()))
+
+    @property
+    def version(self) -> str:
+        self.load()
+        return self.etag.strip('"')[:12]
+
+    def response(self, request: Request, cache_control: str = "no-cache") -> Response:
+        self.load()
+        # Compressed variants share the ETag: they decode to the same bytes
+        headers = {"ETag": self.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        available = [name for name in ("br", "gzip") if name in self.variants]
+        encoding = preferred_encoding(request.headers.get("accept-encoding", ""), available)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.variants[encoding or "identity"], media_type=self.media_type, headers=headers)
+
+
+stylesheet = StaticAsset("style.css", "text/css")
+
+
+def _link_versioned_stylesheet(body: bytes) -> bytes:
+    return body.replace(b'href="style.css"', f'href="/style.css?v={stylesheet.version}"'.encode())
+
+
+index_page = StaticAsset("index.html", "text/html", transform=_link_versioned_stylesheet, depends_on=[stylesheet])
+
+
+def stylesheet_response(request: Request) -> Response:
+    # Only the URL index.html links to may be cached for good
+    if request.query_params.get("v") == stylesheet.version:
+        return stylesheet.response(request, IMMUTABLE_CACHE_CONTROL)
+    return stylesheet.response(request)